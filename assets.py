@@ -0,0 +1,108 @@
+"""Surfaces shared by every sprite that draws them, kept per game.
+
+A game asks for its surfaces here instead of making its own: each one
+is made once, converted to the display's pixel format (so blitting it
+needs no conversion) and handed to every sprite that wants it. Surfaces
+are grouped by owner, the module of the game using them. main.py
+preloads a game's surfaces and fonts when it is picked from the menu
+(see register) and evicts its surfaces when you leave it, so memory
+holds the menu plus the game being played, however many games there are.
+
+Fonts are shared by all games and stay loaded (utils.get_font); they are
+few and slow to open.
+
+    ARCADE_ASSETS=1 python3 main.py   # print memory use on every game switch
+"""
+import os
+import time
+
+import pygame
+
+from utils import loaded_fonts, text_cache_stats
+
+REPORT = os.environ.get("ARCADE_ASSETS") == "1"
+
+_surfaces = {}    # owner -> {key: Surface}
+_preloaders = {}  # owner -> function making everything the owner draws
+
+
+def convert(surface):
+    """surface in the display's pixel format, keeping per-pixel alpha.
+
+    Without a display (headless runs) the surface is returned as it is.
+    """
+    if pygame.display.get_surface() is None:
+        return surface
+    if surface.get_flags() & pygame.SRCALPHA:
+        return surface.convert_alpha()
+    return surface.convert()
+
+
+def surface(owner, key, make):
+    """owner's surface for key, made with make() and converted the first time."""
+    surfaces = _surfaces.setdefault(owner, {})
+    image = surfaces.get(key)
+    if image is None:
+        image = surfaces[key] = convert(make())
+    return image
+
+
+def filled(owner, color, size):
+    """A shared surface of size filled with color."""
+    def make():
+        image = pygame.Surface(size)
+        image.fill(color)
+        return image
+    return surface(owner, ("filled", tuple(color), tuple(size)), make)
+
+
+# ---------------- PRELOADING AND EVICTION ----------------
+def register(owner, preload):
+    """Have preload() make owner's surfaces and fonts before it is played."""
+    _preloaders[owner] = preload
+
+
+def preload(owner):
+    """Make everything owner draws now. Returns the seconds it took."""
+    start = time.perf_counter()
+    loader = _preloaders.get(owner)
+    if loader is not None:
+        loader()
+    seconds = time.perf_counter() - start
+    if REPORT:
+        print(f"preloaded {owner} in {seconds * 1000:.1f} ms")
+        print(report())
+    return seconds
+
+
+def evict(owner):
+    """Forget owner's surfaces; sprites still drawing them keep theirs."""
+    dropped = _surfaces.pop(owner, {})
+    if REPORT:
+        print(f"evicted {owner}: {len(dropped)} surfaces")
+        print(report())
+    return len(dropped)
+
+
+def surface_bytes(image):
+    return image.get_pitch() * image.get_height()
+
+
+def memory():
+    """owner -> (surfaces, bytes) of the surfaces held."""
+    return {owner: (len(surfaces), sum(surface_bytes(s) for s in surfaces.values()))
+            for owner, surfaces in _surfaces.items()}
+
+
+def report():
+    """Memory held by surfaces per owner, the text cache and the fonts."""
+    lines = ["Assets:"]
+    total = 0
+    for owner, (count, size) in memory().items():
+        lines.append(f"  {owner:<16}{count:5} surfaces {size / 1024:9.1f} KB")
+        total += size
+    text = text_cache_stats()
+    lines.append(f"  {'text cache':<16}{text['size']:5} surfaces {text['bytes'] / 1024:9.1f} KB")
+    lines.append(f"  {'fonts':<16}{loaded_fonts():5} loaded")
+    lines.append(f"  {'total':<16}{(total + text['bytes']) / 1024:20.1f} KB")
+    return "\n".join(lines)
@@ -0,0 +1,416 @@
+"""Headless frame-time benchmarks for every game loop.
+
+Each scenario plays a game's GameScene, as the arcade runs it, with a
+scripted bot and a fixed seed under the dummy SDL video driver, and
+reports frame time percentiles, simulation ticks per second and memory
+allocated per frame. Scores go to a throwaway database.
+
+    python3 benchmark.py                        # all scenarios, 2000 frames each
+    python3 benchmark.py -n 500 snake-long      # only some, fewer frames
+    python3 benchmark.py --save baseline.json   # keep the results
+    python3 benchmark.py --compare baseline.json  # flag regressions (exit 1)
+    python3 benchmark.py --idle 10              # CPU used by menus left alone
+"""
+import argparse
+import atexit
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Benchmarks never open a real window or touch the arcade's scores
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+if "ARCADE_SCORES" not in os.environ:
+    _scores = tempfile.mkdtemp(prefix="arcade-benchmark-")
+    atexit.register(shutil.rmtree, _scores, True)  # after the scores' writer exits
+    os.environ["ARCADE_SCORES"] = os.path.join(_scores, "scores.db")
+
+import pygame
+
+import bots
+from utils import FixedStep
+
+SEED = 1234
+
+# A p95 or p99 frame time this much slower than the baseline is a regression
+TOLERANCE = 0.10
+
+
+# ---------------- SCENARIOS ----------------
+class SceneDriver:
+    """Plays a game's real GameScene frame by frame, in place of the SceneManager.
+
+    Every frame runs exactly one tick, the keys held come from the bot,
+    and a game that ends is played again at once, without its end screens.
+    """
+
+    def __init__(self, screen, scene):
+        self.screen = screen
+        self.clock = pygame.time.Clock()
+        self.scene = scene
+        self.held = Keys()
+        self.games = 1
+        scene.manager = self
+        scene.keys = lambda: self.held
+        scene.start()
+        scene.loop = EveryFrame(scene.tick_rate, clock=self.clock)
+
+    def push(self, scene):
+        # Only a game over screen is ever pushed: skip it and play again
+        self.games += 1
+        self.scene.resume(True)
+
+    def step(self, events=(), held=()):
+        """The frame's input and tick."""
+        self.held.clear()
+        self.held.update(held)
+        self.scene.handle_events(list(events))
+        self.scene.update()
+
+    def draw(self):
+        self.scene.draw()
+
+    def close(self):
+        self.scene.stop()
+
+
+class EveryFrame(FixedStep):
+    """One tick per frame, drawn halfway to the next, whatever the time."""
+
+    def due(self):
+        self.ticks += 1
+        return 1
+
+    @property
+    def alpha(self):
+        return 0.5
+
+
+class Keys(set):
+    """Keys held down, read like pygame.key.get_pressed()."""
+
+    __getitem__ = set.__contains__
+
+
+def key_down(key):
+    return pygame.event.Event(pygame.KEYDOWN, key=key, unicode="", mod=0)
+
+
+def arrows(left, right):
+    return [key for key, held in ((pygame.K_LEFT, left), (pygame.K_RIGHT, right)) if held]
+
+
+def snake_cycle(cols, rows):
+    """Successor of every cell on a Hamiltonian cycle of the board.
+
+    Rows are swept left/right over every column but the last, which
+    leads back up to the top. Following it the snake never dies, and its
+    start position (row 5, heading right) already lies on it.
+    """
+    order = []
+    for y in range(rows):
+        xs = range(cols - 1) if y % 2 else range(cols - 2, -1, -1)
+        order.extend((x, y) for x in xs)
+    order.extend((cols - 1, y) for y in range(rows - 1, -1, -1))
+    return {cell: order[(i + 1) % len(order)] for i, cell in enumerate(order)}
+
+
+class SnakeScenario:
+    """Snake following a board-covering cycle, optionally already long."""
+
+    def __init__(self, screen, length=3):
+        import python_game
+
+        self.keys = {direction: key for key, direction in python_game.KEY_DIRECTIONS.items()}
+        random.seed(SEED)  # the scene seeds each game from replay.new_seed()
+        self.driver = SceneDriver(screen, python_game.GameScene())
+        game = self.driver.scene.game
+        self.next_cell = snake_cycle(game.cols, game.rows)
+        self.previous = {b: a for a, b in self.next_cell.items()}
+        self.length = length
+        self.laid = 0  # game the extra body was laid out for
+
+    def lengthen(self, game):
+        # Lay the extra body out backwards along the cycle from the tail
+        tail = game.snake[-1]
+        while len(game.snake) < self.length:
+            tail = self.previous[tail]
+            game.snake.append(tail)
+            game._take(tail)
+        if not game.is_free(game.food):
+            game.food = game._spawn_food()
+        self.driver.scene.renderer.invalidate()
+        self.laid = self.driver.games
+
+    def step(self):
+        game = self.driver.scene.game
+        if self.laid != self.driver.games:
+            self.lengthen(game)
+        head = game.snake[0]
+        target = self.next_cell[head]
+        self.driver.step([key_down(self.keys[(target[0] - head[0], target[1] - head[1])])])
+
+    def draw(self):
+        self.driver.draw()
+
+    def close(self):
+        self.driver.close()
+
+
+class JumperScenario:
+    """Jumper with a bot that climbs from platform to platform, from height up."""
+
+    def __init__(self, screen, height=0):
+        import jumper
+        self.driver = SceneDriver(screen, jumper.GameScene(SEED, height=height))
+
+    def step(self):
+        self.driver.step(held=arrows(*bots.jumper_keys(self.driver.scene.game)))
+
+    def draw(self):
+        self.driver.draw()
+
+    def close(self):
+        self.driver.close()
+
+
+class BrickScenario:
+    """Brick Breaker with a paddle that tracks the ball, optionally a wall of
+    rows of one kind of brick (see levels.py)."""
+
+    def __init__(self, screen, level_index=0, rows=None, brick="3"):
+        import brickbreaker
+
+        pack = None
+        if rows:
+            import levels
+            row = brick * brickbreaker.BRICK_COLS + "\n"
+            pack = levels.LevelPack.from_text("= Wall\n" + row * rows)
+        random.seed(SEED)  # the scene seeds each game from replay.new_seed()
+        self.driver = SceneDriver(screen, brickbreaker.GameScene(level_index, pack))
+
+    def step(self):
+        left, right, launch = bots.brick_keys(self.driver.scene.game)
+        self.driver.step([key_down(pygame.K_SPACE)] if launch else [], arrows(left, right))
+
+    def draw(self):
+        self.driver.draw()
+
+    def close(self):
+        self.driver.close()
+
+
+class ParticleScenario:
+    """Bursts of particles all over the screen, about 14k alive at a time."""
+
+    def __init__(self, screen, per_step=400):
+        import particles
+        from renderer import Renderer
+
+        self.renderer = Renderer(screen, (0, 0, 0))
+        self.particles = particles.ParticleSystem(screen, seed=SEED)
+        self.rects = [pygame.Rect(x, y, 50, 20) for x in range(0, 600, 60) for y in range(40, 360, 40)]
+        self.bursts = per_step // particles.BURST
+        self.next = 0
+
+    def step(self):
+        for _ in range(self.bursts):
+            self.particles.burst(self.rects[self.next], (255, 200, 0))
+            self.next = (self.next + 1) % len(self.rects)
+        self.particles.update()
+
+    def draw(self):
+        if not self.renderer.full_redraw:
+            self.particles.erase(self.renderer.sprites)
+        self.renderer.draw()
+        if self.particles.draw():
+            self.renderer.mark(self.particles.drawn)
+        self.renderer.present()
+
+    def close(self):
+        pass
+
+
+SCENARIOS = {
+    "snake": lambda screen: SnakeScenario(screen),
+    "snake-long": lambda screen: SnakeScenario(screen, length=500),
+    "jumper": lambda screen: JumperScenario(screen),
+    "jumper-late": lambda screen: JumperScenario(screen, height=45),
+    "brickbreaker": lambda screen: BrickScenario(screen),
+    "brickbreaker-dense": lambda screen: BrickScenario(screen, rows=10),
+    "brickbreaker-large": lambda screen: BrickScenario(screen, level_index=4),
+    "brickbreaker-multiball": lambda screen: BrickScenario(screen, rows=5, brick="*"),
+    "particles": lambda screen: ParticleScenario(screen),
+}
+
+
+# ---------------- MEASURING ----------------
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, round(p / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def run_scenario(name, frames, screen):
+    """Time frames of one scenario. Returns a dict of results."""
+    scenario = SCENARIOS[name](screen)
+    clock = time.perf_counter_ns
+
+    # Timing pass: input + tick, then draw + present, per frame
+    frame_ns = []
+    step_ns = 0
+    for _ in range(frames):
+        pygame.event.pump()
+        start = clock()
+        scenario.step()
+        stepped = clock()
+        scenario.draw()
+        end = clock()
+        step_ns += stepped - start
+        frame_ns.append(end - start)
+    scenario.close()
+
+    # Allocation pass, separate so tracing does not skew the timings
+    scenario = SCENARIOS[name](screen)
+    tracemalloc.start()
+    allocated = 0
+    for _ in range(frames):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        scenario.step()
+        scenario.draw()
+        allocated += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    scenario.close()
+
+    frame_ns.sort()
+    ms = [ns / 1e6 for ns in frame_ns]
+    return {
+        "frames": frames,
+        "p50_ms": percentile(ms, 50),
+        "p95_ms": percentile(ms, 95),
+        "p99_ms": percentile(ms, 99),
+        "max_ms": ms[-1],
+        "ticks_per_sec": frames / (step_ns / 1e9) if step_ns else 0.0,
+        "alloc_kb_per_frame": allocated / frames / 1024,
+    }
+
+
+# ---------------- IDLE SCREENS ----------------
+def idle_menu():
+    import main
+    return main.Menu()
+
+
+def idle_level_select():
+    import brickbreaker
+    return brickbreaker.LevelSelect(brickbreaker.GameScene)
+
+
+def idle_initials():
+    from scenes import InitialsPrompt
+    from utils import get_font
+    return InitialsPrompt(get_font("arial", 24))
+
+
+def idle_leaderboard():
+    from leaderboard import Leaderboard
+    from scenes import GameOver
+    from utils import get_font
+    board = Leaderboard(":memory:")  # a full top 5, so 0 goes straight to the board
+    for score in range(100, 600, 100):
+        board.add("benchmark", "BOT", score)
+    font = get_font("arial", 24)
+    return GameOver(board, "benchmark", 0, lambda screen: screen.fill((0, 0, 0)), font, font)
+
+
+IDLE_SCREENS = {
+    "menu": idle_menu,
+    "level select": idle_level_select,
+    "initials": idle_initials,
+    "leaderboard": idle_leaderboard,
+}
+
+
+def run_idle(make_scene, seconds, screen):
+    """Share of one core used while a screen sits untouched for seconds."""
+    from scenes import SceneManager
+    manager = SceneManager(screen)
+    manager.push(make_scene())
+    pygame.event.clear()
+    pygame.time.set_timer(pygame.QUIT, int(seconds * 1000), loops=1)
+    wall, cpu = time.perf_counter(), time.process_time()
+    manager.run()
+    return (time.process_time() - cpu) / (time.perf_counter() - wall)
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Lines describing scenarios slower than the baseline."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for key in ("p95_ms", "p99_ms"):
+            if base[key] and result[key] > base[key] * (1 + tolerance):
+                regressions.append(f"{name}: {key} {base[key]:.3f} -> {result[key]:.3f} ms "
+                                   f"(+{100 * (result[key] / base[key] - 1):.0f}%)")
+        if base["ticks_per_sec"] and result["ticks_per_sec"] < base["ticks_per_sec"] / (1 + tolerance):
+            regressions.append(f"{name}: ticks/s {base['ticks_per_sec']:,.0f} -> "
+                               f"{result['ticks_per_sec']:,.0f}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless frame-time benchmarks.")
+    parser.add_argument("scenarios", nargs="*",
+                        help=f"scenarios to run (default: all): {', '.join(SCENARIOS)}")
+    parser.add_argument("-n", "--frames", type=int, default=2000)
+    parser.add_argument("--save", metavar="FILE", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="FILE", help="flag regressions against a baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--idle", type=float, metavar="SECONDS",
+                        help="instead, measure the CPU each menu uses when left alone this long")
+    args = parser.parse_args(argv)
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario {name!r}")
+
+    pygame.init()
+    screen = pygame.display.set_mode((600, 400))
+
+    if args.idle:
+        for name, make_scene in IDLE_SCREENS.items():
+            print(f"{name:<20}{100 * run_idle(make_scene, args.idle, screen):6.1f}% CPU")
+        return 0
+
+    results = {}
+    print(f"{'scenario':<20}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'ticks/s':>12}{'KB/frame':>10}")
+    for name in args.scenarios or SCENARIOS:
+        r = results[name] = run_scenario(name, args.frames, screen)
+        print(f"{name:<20}{r['p50_ms']:>9.3f}{r['p95_ms']:>9.3f}{r['p99_ms']:>9.3f}"
+              f"{r['ticks_per_sec']:>12,.0f}{r['alloc_kb_per_frame']:>10.1f}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print("REGRESSION", line)
+        if regressions:
+            return 1
+        print("no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Scripted players for headless runs (benchmark.py, tournament.py).
+
+Each bot reads a game's state, like a player reading the screen, and
+returns the input for the next tick.
+"""
+
+
+def snake_move(game, lookahead=1):
+    """Direction for a SnakeGame: towards the food, along a line that stays
+    clear for the next lookahead cells (the bot will not turn again before
+    then). Returns None when every direction is blocked."""
+    head = game.snake[0]
+    fx, fy = game.food
+    back = (-game.direction[0], -game.direction[1])
+    best, best_key = None, None
+    for d in ((0, -1), (0, 1), (-1, 0), (1, 0)):
+        if d == back:
+            continue
+        x, y = head
+        clear = 0
+        nearest = None  # closest the run gets to the food
+        while clear < lookahead:
+            x, y = x + d[0], y + d[1]
+            if not (0 <= x < game.cols and 0 <= y < game.rows) or not game.is_free((x, y)):
+                break
+            clear += 1
+            distance = abs(fx - x) + abs(fy - y)
+            if nearest is None or distance < nearest:
+                nearest = distance
+        if not clear:
+            continue
+        # Safe for the whole lookahead first, then closer to the food, then straight on
+        key = (clear < lookahead, nearest, d != game.direction)
+        if best_key is None or key < best_key:
+            best, best_key = d, key
+    return best
+
+
+def jumper_keys(game):
+    """(left, right) for a JumperGame: climb from platform to platform."""
+    player = game.player.world
+    # Aim for the next platform above the last one landed on, unless
+    # already falling past it; then land on whatever is below
+    base = game.last_platform.world.top if game.last_platform else player.bottom
+    above = [p.world for p in game.platforms if p.world.top < base - 5]
+    target = max(above, key=lambda r: r.top, default=None)
+    if target is None or (game.player.vel_y > 0 and player.bottom > target.top):
+        below = [p.world for p in game.platforms if p.world.top >= player.bottom - 5]
+        target = min(below, key=lambda r: (r.top - player.bottom, abs(r.centerx - player.centerx)),
+                     default=None)
+    dx = target.centerx - player.centerx if target else 0
+    return dx < -4, dx > 4
+
+
+def brick_keys(game):
+    """(left, right, launch) for a BrickBreakerGame: keep the paddle under the ball."""
+    dx = game.ball.rect.centerx - game.paddle.rect.centerx
+    return dx < -8, dx > 8, True
@@ -1,10 +1,23 @@
+import os
 import pygame
-import sys
 import random
 
+import assets
+import levels
+
+from profiler import NULL_PROFILER
+from renderer import TextSprite
+from leaderboard import get_leaderboard
+import replay
+from scenes import GameOver, PlayScene, Scene
+from utils import get_font, lerp, particle_system, render_text
+
 # Game constants
 WIDTH, HEIGHT = 600, 400
-FPS = 60
+FPS = 60  # simulation ticks per second (drawing runs at utils.RENDER_FPS)
+
+# Bump when a change to the rules would make old replays play out differently
+RULES_VERSION = 0
 
 #brick constants
 BRICK_W, BRICK_H = 50, 20
@@ -12,33 +25,18 @@ BRICK_GAP_X, BRICK_GAP_Y = 5, 5
 BRICK_COLS = 10
 
 
-# Level layouts: ' ' = empty, '1' = 1-hit, '2' = 2-hit, '3' = 3-hit
-LEVELS = [
-    # Level 1 – simple wall of 1-hit bricks
-    [
-        "1111111111",
-        "1111111111",
-        "1111111111",
-        "1111111111",
-        "1111111111",
-    ],
-    # Level 2 – tougher core with 3-hit bricks
-    [
-        "1112222211",
-        "1122332211",
-        "1233333211",
-        "1122332211",
-        "1112222211",
-    ],
-    # Level 3 – not finished yet
-    [
-        "  222222  ",
-        " 21111112 ",
-        "2111111112",
-        " 21111112 ",
-        "  222222  ",
-    ],
-]
+# Levels come from a pack (see levels.py); replays store the level's
+# index in it. Another pack: ARCADE_LEVELS=mypack.txt python3 main.py
+LEVEL_PACK = os.environ.get(
+    "ARCADE_LEVELS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "levelpacks", "classic.txt"))
+
+# Area the bricks are laid out in, above where the ball starts. Grids
+# that do not fit at BRICK_W x BRICK_H get smaller bricks.
+LEVEL_AREA = pygame.Rect(10, 40, WIDTH - 20, 145)
+
+# Draw the bricks as one layer (see BrickLayer) rather than one sprite
+# each. ARCADE_BRICK_SPRITES=1 draws them as sprites, for comparison.
+BATCH_BRICKS = os.environ.get("ARCADE_BRICK_SPRITES") != "1"
 
 
 # Colors
@@ -47,62 +45,195 @@ WHITE = (255, 255, 255)
 BLUE = (50, 150, 255)
 RED = (200, 50, 50)
 GREEN = (0, 200, 0)
+STEEL_GRAY = (130, 130, 140)
+MULTIBALL_CYAN = (0, 200, 220)
 
 # Paddle
-class Paddle(pygame.sprite.Sprite):
+PADDLE_SIZE = (80, 10)
+
+
+class Paddle(pygame.sprite.DirtySprite):
     def __init__(self):
         super().__init__()
-        self.image = pygame.Surface((80, 10))
-        self.image.fill(BLUE)
+        self.image = assets.filled(__name__, BLUE, PADDLE_SIZE)
         self.rect = self.image.get_rect(midbottom=(WIDTH // 2, HEIGHT - 20))
         self.speed = 6
+        self.x = self.prev_x = self.rect.x  # rect.x may be interpolated for drawing
+
+    def reset(self):
+        self.rect.midbottom = (WIDTH // 2, HEIGHT - 20)
+        self.x = self.prev_x = self.rect.x
+        self.dirty = 1
+
+    def update(self, left=False, right=False):
+        self.prev_x = self.x
+        if left and self.x > 0:
+            self.x -= self.speed
+        if right and self.x + self.rect.width < WIDTH:
+            self.x += self.speed
+        self.place(self.x)
+
+    def place(self, x):
+        """Draw the paddle at x from the next frame on."""
+        if self.rect.x != x:
+            self.rect.x = x
+            self.dirty = 1
+
+# Swept collision
+def sweep_aabb(box, move, target):
+    """Swept test of box (x, y, w, h) moving by (dx, dy) against a static rect.
+
+    Returns (t, normal) of the first contact, t in [0, 1], or None."""
+    x, y, w, h = box
+    dx, dy = move
+
+    if dx > 0:
+        x_entry, x_exit = (target.left - (x + w)) / dx, (target.right - x) / dx
+    elif dx < 0:
+        x_entry, x_exit = (target.right - x) / dx, (target.left - (x + w)) / dx
+    elif x + w <= target.left or x >= target.right:
+        return None
+    else:
+        x_entry, x_exit = float("-inf"), float("inf")
+
+    if dy > 0:
+        y_entry, y_exit = (target.top - (y + h)) / dy, (target.bottom - y) / dy
+    elif dy < 0:
+        y_entry, y_exit = (target.bottom - y) / dy, (target.top - (y + h)) / dy
+    elif y + h <= target.top or y >= target.bottom:
+        return None
+    else:
+        y_entry, y_exit = float("-inf"), float("inf")
+
+    entry = max(x_entry, y_entry)
+    if entry > min(x_exit, y_exit) or entry < 0 or entry > 1:
+        return None
+    if x_entry > y_entry:
+        return entry, (-1 if dx > 0 else 1, 0)
+    return entry, (0, -1 if dy > 0 else 1)
 
-    def update(self, keys):
-        if keys[pygame.K_LEFT] and self.rect.left > 0:
-            self.rect.x -= self.speed
-        if keys[pygame.K_RIGHT] and self.rect.right < WIDTH:
-            self.rect.x += self.speed
+
+# Walls as solid rects just outside the screen (the bottom stays open)
+WALLS = [
+    pygame.Rect(-100, -100, 100, HEIGHT + 200),      # left
+    pygame.Rect(WIDTH, -100, 100, HEIGHT + 200),     # right
+    pygame.Rect(-100, -100, WIDTH + 200, 100),       # top
+]
+MAX_BOUNCES = 8  # contacts resolved per frame before giving up the rest
+BALL_SPEED = 3
 
 # Ball
-class Ball(pygame.sprite.Sprite):
+def ball_surface():
+    image = pygame.Surface((10, 10), pygame.SRCALPHA)
+    pygame.draw.circle(image, RED, (5, 5), 5)
+    return image
+
+
+class Ball(pygame.sprite.DirtySprite):
     def __init__(self):
         super().__init__()
-        self.image = pygame.Surface((10, 10), pygame.SRCALPHA)
-        pygame.draw.circle(self.image, RED, (5, 5), 5)
+        self.image = assets.surface(__name__, "ball", ball_surface)
         self.rect = self.image.get_rect(center=(WIDTH // 2, HEIGHT // 2))
-        self.vel = [3, -3]
-
-    def update(self):
-        self.rect.x += self.vel[0]
-        self.rect.y += self.vel[1]
-
-        # Bounce off walls
-        if self.rect.left <= 0 or self.rect.right >= WIDTH:
-            self.vel[0] = -self.vel[0]
-        if self.rect.top <= 0:
+        self.pos = [float(self.rect.x), float(self.rect.y)]
+        self.prev_pos = self.pos  # before the last tick, for interpolation
+        self.vel = [BALL_SPEED, -BALL_SPEED]
+        self.dirty = 2  # moves every frame
+
+    def reset(self, direction=1):
+        self.rect.center = (WIDTH // 2, HEIGHT // 2)
+        self.pos = self.prev_pos = [float(self.rect.x), float(self.rect.y)]
+        self.vel = [BALL_SPEED * direction, -BALL_SPEED]
+
+    def move(self, paddle, bricks):
+        """Move one tick, bouncing off walls, the paddle and bricks. Returns the bricks hit."""
+        w, h = self.rect.size
+        x, y = self.prev_pos = self.pos
+        # rect may hold an interpolated draw position; collide from pos
+        self.rect.topleft = (round(x), round(y))
+
+        # Paddle moved into the ball: put it back on top
+        if self.vel[1] > 0 and self.rect.colliderect(paddle.rect):
+            y = paddle.rect.top - h
             self.vel[1] = -self.vel[1]
 
+        hits = []
+        remaining = 1.0
+        for _ in range(MAX_BOUNCES):
+            dx, dy = self.vel[0] * remaining, self.vel[1] * remaining
+            # Only the bricks under the swept area can be reached
+            area = pygame.Rect(int(min(x, x + dx)) - 1, int(min(y, y + dy)) - 1,
+                               int(abs(dx)) + w + 3, int(abs(dy)) + h + 3)
+            targets = [(wall, None) for wall in WALLS] + [(paddle.rect, None)]
+            targets += [(b.rect, b) for b in bricks.collide(area)]
+
+            first, contacts = None, []
+            for target, brick in targets:
+                result = sweep_aabb((x, y, w, h), (dx, dy), target)
+                if result is None:
+                    continue
+                t, normal = result
+                if first is None or t < first - 1e-9:
+                    first, contacts = t, [(normal, brick)]
+                elif t <= first + 1e-9:
+                    contacts.append((normal, brick))
+
+            if first is None:
+                x, y = x + dx, y + dy
+                break
+
+            x, y = x + dx * first, y + dy * first
+            if any(n[0] for n, _ in contacts):
+                self.vel[0] = -self.vel[0]
+            if any(n[1] for n, _ in contacts):
+                self.vel[1] = -self.vel[1]
+            hits.extend(brick for _, brick in contacts if brick is not None and brick not in hits)
+            remaining *= 1 - first
+
+        self.pos = [x, y]
+        self.rect.topleft = (round(x), round(y))
+        return hits
+
 # Brick
-class Brick(pygame.sprite.Sprite):
-    def __init__(self, x, y, hits=1):
+# Brick colors by hits left (more than 3 look like 3)
+BRICK_COLORS = {1: (0, 200, 0), 2: (255, 140, 0), 3: (160, 80, 200)}
+
+# One pre-rendered surface per (color, size), shared by every brick, so a
+# hit swaps the image instead of refilling it
+def brick_surface(color, size):
+    return assets.filled(__name__, color, size)
+
+
+class Brick(pygame.sprite.DirtySprite):
+    def __init__(self, x, y, hits=1, kind=levels.NORMAL, size=(BRICK_W, BRICK_H)):
         super().__init__()
         self.max_hits = hits
         self.hits = hits
-        self.image = pygame.Surface((BRICK_W, BRICK_H))
-        self.rect = self.image.get_rect(topleft=(x, y))
+        self.kind = kind
+        self.breakable = kind != levels.STEEL
+        self.rect = pygame.Rect((x, y), size)
+        self._refresh_color()
+
+    def restore(self):
+        """Back to full health, for another go at the level."""
+        self.hits = self.max_hits
         self._refresh_color()
 
     def _refresh_color(self):
         # Color based on remaining hits
-        if self.hits >= 3:
-            self.image.fill((160, 80, 200))   # purple for 3-hit full
-        elif self.hits == 2:
-            self.image.fill((255, 140, 0))    # orange for 2-hit
+        if not self.breakable:
+            color = STEEL_GRAY
+        elif self.kind == levels.MULTIBALL:
+            color = MULTIBALL_CYAN
         else:
-            self.image.fill((0, 200, 0))      # green for 1-hit
+            color = BRICK_COLORS[min(self.hits, 3)]
+        self.color = color
+        self.image = brick_surface(color, self.rect.size)
+        self.dirty = 1
 
     def hit(self):
         """Reduce health by 1. Return True if destroyed."""
+        if not self.breakable:
+            return False
         self.hits -= 1
         if self.hits <= 0:
             self.kill()
@@ -112,180 +243,454 @@ class Brick(pygame.sprite.Sprite):
             return False
 
 
-#build level 
-def build_level(level_index, bricks_group, all_sprites_group):
-    bricks_group.empty()
-    # center the grid horizontally
-    total_w = BRICK_COLS * BRICK_W + (BRICK_COLS - 1) * BRICK_GAP_X
-    start_x = (WIDTH - total_w) // 2
-    rows = LEVELS[level_index]
-    for r, row in enumerate(rows):
-        for c, ch in enumerate(row):
-            if ch == ' ':
-                continue
-            # map characters to hits: 1 = 1-hit, 2 = 2-hit, 3 = 3-hit
-            hits = 3 if ch == '3' else 2 if ch == '2' else 1
-            x = start_x + c * (BRICK_W + BRICK_GAP_X)
-            y = 40 + r * (BRICK_H + BRICK_GAP_Y)
-            b = Brick(x, y, hits=hits)
-            bricks_group.add(b)
-            all_sprites_group.add(b)
-
+class BrickLayer(pygame.sprite.DirtySprite):
+    """All the bricks of a level drawn as one sprite; redraw() repaints one brick's patch."""
 
-#level selection
-def level_select(screen):
-    clock = pygame.time.Clock()
-    font = pygame.font.SysFont("arial", 32)
-    options = [f"Level {i+1}" for i in range(len(LEVELS))] + ["Back"]
-    selected = 0
-
-    selecting = True
-    while selecting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    selected = (selected - 1) % len(options)
-                elif event.key == pygame.K_DOWN:
-                    selected = (selected + 1) % len(options)
-                elif event.key == pygame.K_RETURN:
-                    if options[selected] == "Back":
-                        return None
-                    else:
-                        return selected  # return level index
-
-        # Draw menu
-        screen.fill(BLACK)
-        title = font.render("Choose a Level", True, WHITE)
-        screen.blit(title, (WIDTH//2 - title.get_width()//2, 60))
+    KEY = (255, 0, 255)
 
-        for i, opt in enumerate(options):
-            color = GREEN if i == selected else WHITE
-            text = font.render(opt, True, color)
-            screen.blit(text, (WIDTH//2 - text.get_width()//2, 140 + i*40))
+    def __init__(self, bricks, area=LEVEL_AREA):
+        super().__init__()
+        self.image = pygame.Surface(area.size)
+        if pygame.display.get_surface() is not None:
+            self.image = self.image.convert()
+        self.image.set_colorkey(self.KEY)
+        self.rect = area.copy()
+        self.rebuild(bricks)
+
+    def rebuild(self, bricks):
+        """Draw the layer afresh from bricks."""
+        area = self.rect
+        self.image.fill(self.KEY)
+        self.image.blits([(b.image, b.rect.move(-area.x, -area.y)) for b in bricks], doreturn=False)
+        self.dirty = 1
+
+    def redraw(self, brick):
+        local = brick.rect.move(-self.rect.x, -self.rect.y)
+        self.image.fill(self.KEY, local)
+        if brick.alive():
+            self.image.blit(brick.image, local)
+        for group in self.groups():
+            group.repaint_rect(brick.rect)
+
+
+# Brick group with a spatial index
+class BrickGrid(pygame.sprite.Group):
+    """Sprite group that also buckets bricks by grid cell, so collide() only checks nearby ones."""
+
+    def __init__(self, *sprites, cell_w=BRICK_W + BRICK_GAP_X, cell_h=BRICK_H + BRICK_GAP_Y):
+        self.cell_w = cell_w
+        self.cell_h = cell_h
+        self.breakable = 0
+        self.cells = {}
+        self._sprite_cells = {}
+        super().__init__(*sprites)
+
+    def _covered(self, rect):
+        cols = range(rect.left // self.cell_w, (rect.right - 1) // self.cell_w + 1)
+        rows = range(rect.top // self.cell_h, (rect.bottom - 1) // self.cell_h + 1)
+        return [(c, r) for r in rows for c in cols]
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        covered = self._covered(sprite.rect)
+        self._sprite_cells[sprite] = covered
+        self.breakable += sprite.breakable
+        for cell in covered:
+            self.cells.setdefault(cell, []).append(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.breakable -= sprite.breakable
+        for cell in self._sprite_cells.pop(sprite, ()):
+            bucket = self.cells[cell]
+            bucket.remove(sprite)
+            if not bucket:
+                del self.cells[cell]
+
+    def collide(self, rect):
+        """Return the bricks overlapping rect."""
+        found = []
+        for cell in self._covered(rect):
+            for brick in self.cells.get(cell, ()):
+                if brick not in found and brick.rect.colliderect(rect):
+                    found.append(brick)
+        return found
+
+
+_pack = None
+
+
+def get_pack():
+    """The level pack, compiled on first use (see levels.py)."""
+    global _pack
+    if _pack is None:
+        _pack = levels.load_pack(LEVEL_PACK)
+    return _pack
+
+
+def brick_size(cols, rows):
+    """Brick width and height that fit a cols x rows grid in LEVEL_AREA."""
+    w = min(BRICK_W, (LEVEL_AREA.width - (cols - 1) * BRICK_GAP_X) // cols)
+    h = min(BRICK_H, (LEVEL_AREA.height - (rows - 1) * BRICK_GAP_Y) // rows)
+    return w, h
+
+
+def level_layout(level):
+    """(x, y, w, h, step_x, step_y): the top left of a level's grid, its
+    brick size and the distance from one brick to the next."""
+    w, h = brick_size(level.cols, level.rows)
+    # center the grid horizontally
+    total_w = level.cols * w + (level.cols - 1) * BRICK_GAP_X
+    return (WIDTH - total_w) // 2, LEVEL_AREA.top, w, h, w + BRICK_GAP_X, h + BRICK_GAP_Y
 
-        pygame.display.flip()
-        clock.tick(30)
 
+#build level 
+def build_level(level, bricks_group, all_sprites_group, batched=BATCH_BRICKS):
+    """Add a levels.Level's bricks to the groups. Returns their BrickLayer if batched, else None."""
+    bricks_group.empty()
+    x, y, w, h, step_x, step_y = level_layout(level)
+    bricks = [Brick(x + c * step_x, y + r * step_y, hits, kind, (w, h))
+              for c, r, hits, kind in level.bricks()]
+    bricks_group.add(bricks)
+    if not batched:
+        all_sprites_group.add(bricks)
+        return None
+    layer = BrickLayer(bricks)
+    all_sprites_group.add(layer)
+    return layer
 
 
-def run_game(screen, level_index=0):
-    clock = pygame.time.Clock()
-    font = pygame.font.SysFont("arial", 24)
+def preload_assets():
+    """Make Brick Breaker's surfaces and fonts, and read the pack index (see assets.py)."""
+    assets.filled(__name__, BLUE, PADDLE_SIZE)
+    assets.surface(__name__, "ball", ball_surface)
+    for color in (*BRICK_COLORS.values(), STEEL_GRAY, MULTIBALL_CYAN):
+        brick_surface(color, (BRICK_W, BRICK_H))
+    for size in (20, 24, 32, 48):
+        get_font("arial", size)
+    get_pack()
 
-    # Groups
-    all_sprites = pygame.sprite.Group()
-    bricks = pygame.sprite.Group()
 
-    paddle = Paddle()
-    ball = Ball()
-    all_sprites.add(paddle, ball)
-    waiting_to_start = True 
+assets.register(__name__, preload_assets)
 
-    #build chosen level
-    build_level(level_index, bricks, all_sprites)
 
-    score = 0
-    lives = 3
-    running = True
-    cleared = False
+#level selection
+LEVELS_PER_PAGE = 5
+
+
+class LevelSelect(Scene):
+    """Pick a level from the pack, a page at a time, and play it with play(index)."""
+
+    idle = True
+
+    def __init__(self, play):
+        self.play = play
+        self.font = get_font("arial", 32)
+        self.small_font = get_font("arial", 20)
+        self.pack = get_pack()
+        self.count = len(self.pack)
+        self.pages = (self.count + LEVELS_PER_PAGE - 1) // LEVELS_PER_PAGE
+        self.selected = 0  # level index, or count for "Back"
+        self.page = 0
+        self.drawn = None  # selection on screen
+
+    def handle_event(self, event):
+        if event.type != pygame.KEYDOWN:
+            return
+        count = self.count
+        if event.key == pygame.K_UP:
+            self.selected = (self.selected - 1) % (count + 1)
+        elif event.key == pygame.K_DOWN:
+            self.selected = (self.selected + 1) % (count + 1)
+        elif event.key in (pygame.K_RIGHT, pygame.K_PAGEDOWN):
+            self.selected = min(count - 1, (self.page + 1) * LEVELS_PER_PAGE)
+        elif event.key in (pygame.K_LEFT, pygame.K_PAGEUP):
+            self.selected = max(0, (self.page - 1) * LEVELS_PER_PAGE)
+        elif event.key == pygame.K_RETURN:
+            if self.selected == count:
+                self.manager.pop()
+            else:
+                self.manager.push(self.play(self.selected))
 
-    while running:
-        keys = pygame.key.get_pressed()
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if waiting_to_start and event.key == pygame.K_SPACE:
-                    waiting_to_start = False 
+    def resume(self, result=None):
+        self.drawn = None  # the game drew over the list
 
-        # Update
-        paddle.update(keys)
-
-        if not waiting_to_start:
-            ball.update()
-
-        # Ball hits paddle
-        if ball.rect.colliderect(paddle.rect):
-            ball.vel[1] = -ball.vel[1]
-
-        # Ball hits brick
-        hit_list = pygame.sprite.spritecollide(ball, bricks, False)
-        if hit_list:
-            ball.vel[1] = -ball.vel[1]
-            for b in hit_list:
-                destroyed = b.hit()
-                if destroyed:
-                    score += 10
-        
-        # Level cleared if no bricks remain
-        if len(bricks) == 0:
-            running = False
-            cleared = True
-            break
-
-        # Ball falls below screen
-        if ball.rect.top > HEIGHT:
-            lives -= 1
-            if lives <= 0:
-                running = False
-            else:
-                # Reset ball + paddle
-                ball.rect.center = (WIDTH // 2, HEIGHT // 2)
-                ball.vel = [3 * random.choice([-1, 1]), -3]
-                paddle.rect.midbottom = (WIDTH // 2, HEIGHT - 20)
+    def draw(self):
+        if self.selected == self.drawn:
+            return
+        self.drawn = self.selected
+        pack, count, font = self.pack, self.count, self.font
+        if self.selected < count:
+            self.page = self.selected // LEVELS_PER_PAGE
+        screen = self.manager.screen
 
-                waiting_to_start = True 
-                
-        # Draw
+        # Only this page's names, which the pack index already holds
         screen.fill(BLACK)
-        all_sprites.draw(screen)
+        title = render_text(font, "Choose a Level", WHITE)
+        screen.blit(title, (WIDTH//2 - title.get_width()//2, 40))
 
-        if waiting_to_start:
-            start_text = font.render("Press SPACE to Start", True, WHITE)
-            screen.blit(start_text, (WIDTH // 2- start_text.get_width() // 2, HEIGHT // 2 - 20))
+        first = self.page * LEVELS_PER_PAGE
+        shown = [(i, f"{i + 1}. {pack.names[i]}") for i in range(first, min(count, first + LEVELS_PER_PAGE))]
+        shown.append((count, "Back"))
+        for row, (i, opt) in enumerate(shown):
+            color = GREEN if i == self.selected else WHITE
+            text = render_text(font, opt, color)
+            screen.blit(text, (WIDTH//2 - text.get_width()//2, 100 + row*40))
 
-        score_text = font.render(f"Score: {score}", True, WHITE)
-        lives_text = font.render(f"Lives: {lives}", True, WHITE)
-        screen.blit(score_text, (10, 10))
-        screen.blit(lives_text, (WIDTH - 100, 10))
+        if self.pages > 1:
+            hint = render_text(self.small_font, f"Page {self.page + 1}/{self.pages}  (Left/Right to turn)", WHITE)
+            screen.blit(hint, (WIDTH//2 - hint.get_width()//2, HEIGHT - 40))
 
         pygame.display.flip()
-        clock.tick(FPS)
 
-    # End screen
-    screen.fill(BLACK)
-    big_font = pygame.font.SysFont("arial", 32)
 
-    if cleared:
-        msg = big_font.render("LEVEL CLEARED!", True, GREEN)
-        tip = font.render("Press Enter to play again or Esc to return", True, WHITE)
-    else:
-        msg = big_font.render("GAME OVER", True, RED)
-        tip = font.render("Press Enter to try again or Esc to return", True, WHITE)
-
-    final_score = font.render(f"Final Score: {score}", True, WHITE)
-
-    screen.blit(msg, (WIDTH // 2 - msg.get_width() // 2, HEIGHT // 2 - 40))
-    screen.blit(final_score, (WIDTH // 2 - final_score.get_width() // 2, HEIGHT // 2))
-    screen.blit(tip, (WIDTH // 2 - tip.get_width() // 2, HEIGHT // 2 + 40))
-
-    pygame.display.flip()
-
-    # Wait for input
-    waiting = True
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_RETURN:  # restart same level
-                    run_game(screen, level_index)
-                    return
-                elif event.key == pygame.K_ESCAPE:  # back to level select
-                    return
+class BrickBreakerGame:
+    """One Brick Breaker level without drawing or input polling.
+
+    Multi-ball bricks add a multiball.BallSwarm (needs NumPy); reset() reuses the sprites.
+    """
+
+    def __init__(self, level_index=0, seed=None, all_sprites=None, profiler=NULL_PROFILER, pack=None,
+                 batched=BATCH_BRICKS):
+        self.all_sprites = pygame.sprite.LayeredDirty() if all_sprites is None else all_sprites
+        self.profiler = profiler
+        self.level_index = level_index
+
+        self.bricks = BrickGrid()
+        self.paddle = Paddle()
+        self.ball = Ball()
+        self.all_sprites.add(self.paddle, self.ball)
+
+        #build chosen level
+        self.level = (get_pack() if pack is None else pack).level(level_index)
+        self.layer = build_level(self.level, self.bricks, self.all_sprites, batched)
+        self.level_bricks = list(self.bricks)  # in the order of the level's arrays
+        self.swarm = None
+        if levels.MULTIBALL in self.level.kind:
+            import multiball
+            self.swarm = multiball.BallSwarm(
+                self.level_bricks, self.level.col, self.level.row, level_layout(self.level),
+                self.level.cols, self.level.rows, self.ball.image, (WIDTH, HEIGHT))
+        self.on_break = None
+        self._new_game(seed)
+
+    def reset(self, seed=None):
+        """Start the level over: every brick restored, the ball and paddle back."""
+        for brick in self.level_bricks:
+            brick.restore()
+        # Emptied first so the bricks are indexed in their original order again
+        self.bricks.empty()
+        self.bricks.add(self.level_bricks)
+        if self.layer is None:
+            self.all_sprites.add(self.level_bricks)
+        else:
+            self.layer.rebuild(self.level_bricks)
+        if self.swarm is not None:
+            self.swarm.reset()
+        self.ball.reset()
+        self.paddle.reset()
+        self._new_game(seed)
+
+    def _new_game(self, seed):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.ball_in_play = True  # False once the ball fell out while the swarm plays on
+        self.score = 0
+        self.lives = 3
+        self.ticks = 0
+        self.waiting_to_start = True
+        self.cleared = False
+        self.alive = True
+
+    def interpolate(self, alpha):
+        """Place the ball and paddle rects between the last two ticks for drawing."""
+        ball, paddle = self.ball, self.paddle
+        if ball.prev_pos is not ball.pos:
+            ball.rect.topleft = (round(lerp(ball.prev_pos[0], ball.pos[0], alpha)),
+                                 round(lerp(ball.prev_pos[1], ball.pos[1], alpha)))
+        paddle.place(round(lerp(paddle.prev_x, paddle.x, alpha)))
+
+    def step(self, left=False, right=False, launch=False):
+        """Advance one tick. launch is a SPACE press. Returns True while alive."""
+        if not self.alive:
+            return False
+        self.ticks += 1
+        if self.waiting_to_start and launch:
+            self.waiting_to_start = False
+
+        # Update
+        self.paddle.update(left, right)
+        self.profiler.lap("update")
+
+        # Move balls, bouncing off walls, paddle and bricks
+        if not self.waiting_to_start:
+            if self.ball_in_play:
+                self._hit(self.ball.move(self.paddle, self.bricks))
+            if self.swarm is not None and self.swarm.count:
+                bricks = self.swarm.bricks
+                self._hit([bricks[i] for i in self.swarm.move(self.paddle.rect).tolist()])
+
+        self.profiler.lap("collision")
+
+        # Level cleared if only steel bricks remain
+        if self.bricks.breakable == 0:
+            self.alive = False
+            self.cleared = True
+            return False
+
+        # Ball falls below screen; the swarm may still be playing
+        if self.ball_in_play and self.ball.rect.top > HEIGHT:
+            self.ball_in_play = False
+        if not self.ball_in_play and not (self.swarm is not None and self.swarm.count):
+            self.ball_in_play = True
+            self.lives -= 1
+            if self.lives <= 0:
+                self.alive = False
+            else:
+                # Reset ball + paddle
+                self.ball.reset(self.rng.choice([-1, 1]))
+                self.paddle.reset()
+
+                self.waiting_to_start = True
+        return self.alive
+
+    def _hit(self, bricks):
+        split = False
+        for b in bricks:
+            if not b.alive():
+                continue  # another ball destroyed it this tick
+            destroyed = b.hit()
+            if destroyed:
+                self.score += 10
+                if self.on_break is not None:
+                    self.on_break(b.rect, b.color)
+                if self.swarm is not None:
+                    self.swarm.remove_brick(b)
+                    split = split or b.kind == levels.MULTIBALL
+            if self.layer is not None and b.breakable:
+                self.layer.redraw(b)
+        if split:
+            ball = self.ball
+            self.swarm.split([(*ball.pos, *ball.vel)] if self.ball_in_play else [])
+
+
+class GameScene(PlayScene):
+    """One level of Brick Breaker, from the first launch to the leaderboard and round again."""
+
+    name = "brickbreaker"
+    title = "Brick Breaker"
+    tick_rate = FPS
+
+    def __init__(self, level_index=0, pack=None):
+        self.level_index = level_index
+        self.pack = pack  # default: the level pack in use
+        self.font = get_font("arial", 24)
+        self.board = get_leaderboard()
+        self.board.preload("brickbreaker")
+
+    def start(self):
+        super().start()
+        screen = self.manager.screen
+        self.game = BrickBreakerGame(self.level_index, replay.new_seed(), self.renderer.sprites,
+                                     self.profiler, self.pack)
+        self.particles = particle_system(screen)
+        if self.particles is not None:
+            self.game.on_break = self.particles.burst
+
+        # HUD on a layer above the sprites
+        font = self.font
+        self.start_text = TextSprite(font, WHITE, midtop=(WIDTH // 2, HEIGHT // 2 - 20))
+        self.start_text.set_text("Press SPACE to Start")
+        self.score_text = TextSprite(font, WHITE, topleft=(10, 10))
+        self.lives_text = TextSprite(font, WHITE, topleft=(WIDTH - 100, 10))
+        self.renderer.sprites.add(self.start_text, self.score_text, self.lives_text, layer=1)
+        self._record()
+
+    def _record(self):
+        # Every session gets its own seed, recorded with its inputs
+        self.recording = replay.Replay("brickbreaker", self.game.seed, self.level_index, RULES_VERSION)
+        self.started = pygame.time.get_ticks()
+        self.launch = False  # SPACE pressed and not yet seen by a tick
+
+    def new_game(self):
+        self.game.reset(replay.new_seed())
+        if self.particles is not None:
+            self.particles.clear()
+        self.renderer.invalidate()
+        self.loop.reset()
+        self._record()
+
+    def handle_events(self, events):
+        self.profiler.start()
+        for event in events:
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                self.launch = True
+            self.profiler.handle_event(event)
+
+    def update(self):
+        game, particles = self.game, self.particles
+        keys = self.keys()
+        left, right = keys[pygame.K_LEFT], keys[pygame.K_RIGHT]
+        self.profiler.lap("events")
+        for _ in range(self.loop.due()):
+            self.recording.record(replay.input_bits(left=left, right=right, action=self.launch))
+            game.step(left, right, self.launch)
+            self.launch = False  # a key press counts for one tick only
+            if particles is not None:
+                particles.update()
+            if not game.alive:
+                break
+
+    def draw(self):
+        game, particles, renderer, profiler = self.game, self.particles, self.renderer, self.profiler
+        screen = renderer.screen
+        game.interpolate(self.loop.alpha)
+        self.start_text.visible = game.waiting_to_start
+        self.score_text.set_text(f"Score: {game.score}")
+        self.lives_text.set_text(f"Lives: {game.lives}")
+        if not renderer.full_redraw:
+            if game.swarm is not None:
+                game.swarm.erase(renderer.sprites)
+            if particles is not None:
+                particles.erase(renderer.sprites)
+        renderer.draw()
+        # Balls and particles are drawn straight onto the screen: too many to be sprites
+        if game.swarm is not None:
+            renderer.mark(*game.swarm.draw(screen, self.loop.alpha))
+        if particles is not None and particles.draw():
+            renderer.mark(particles.drawn)
+        profiler.lap("draw")
+        renderer.present()
+        profiler.lap("present")
+        profiler.end()
+        if not game.alive:
+            self.game_over()
+
+    def game_over(self):
+        score, cleared = self.game.score, self.game.cleared
+        self.board.save_replay("brickbreaker", score, self.recording.to_bytes(score))
+        self.board.record_session("brickbreaker", score, (pygame.time.get_ticks() - self.started) / 1000)
+        big_font = get_font("arial", 32)
+
+        def show_result(screen):
+            screen.fill(BLACK)
+            if cleared:
+                msg = render_text(big_font, "LEVEL CLEARED!", GREEN)
+            else:
+                msg = render_text(big_font, "GAME OVER", RED)
+            final_score = render_text(self.font, f"Final Score: {score}", WHITE)
+            screen.blit(msg, (WIDTH // 2 - msg.get_width() // 2, HEIGHT // 2 - 40))
+            screen.blit(final_score, (WIDTH // 2 - final_score.get_width() // 2, HEIGHT // 2))
 
+        if cleared:
+            tip = "Press Enter to play again or Esc to return"
+        else:
+            tip = "Press Enter to try again or Esc to return"
+        self.manager.push(GameOver(self.board, "brickbreaker", score, show_result, self.font, big_font,
+                                   hints=[tip]))
+
+    def resume(self, again=False):
+        if again:
+            self.new_game()  # same level
+        else:
+            self.manager.pop()  # back to level select
@@ -1,290 +1,568 @@
 import pygame
-import sys
 import random
-import os
-
-
-# Load high scores from file
-def load_high_scores():
-    if not os.path.exists("highscores_jumper.txt"):
-        return []
-    scores = []
-    with open("highscores_jumper.txt", "r") as f:
-        for line in f:
-            parts = line.strip().split()
-            if len(parts) == 2 and parts[1].isdigit():
-                initials, score = parts
-                scores.append((initials, int(score)))
-    return scores
-
-# Save high scores to file
-def save_high_scores(scores):
-    with open("highscores_jumper.txt", "w") as f:
-        for initials, score in scores[:5]:
-            f.write(f"{initials} {score}\n")
-
-# Prompt for initials
-def get_initials(screen, font):
-    initials = ""
-    big_font = pygame.font.SysFont("arial", 48)
-
-    while True:
-        screen.fill(BLACK)
-        prompt = font.render("Enter your initials (3 letters):", True, WHITE)
-        current = big_font.render(initials, True, WHITE)
-
-        screen.blit(prompt, (WIDTH//2 - prompt.get_width()//2, HEIGHT//2 - 60))
-        screen.blit(current, (WIDTH//2 - current.get_width()//2, HEIGHT//2))
-        pygame.display.flip()
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_RETURN and len(initials) == 3:
-                    return initials
-                elif event.key == pygame.K_BACKSPACE and len(initials) > 0:
-                    initials = initials[:-1]
-                elif len(initials) < 3 and event.unicode.isalpha():
-                    initials += event.unicode.upper()
+from collections import deque
 
+from profiler import NULL_PROFILER
+from renderer import TextSprite
+from leaderboard import get_leaderboard
+import assets
+import replay
+from scenes import GameOver, PlayScene, Scene
+from utils import get_font, lerp, particle_system, render_text
 
 
 # Game constants
 WIDTH, HEIGHT = 600, 400
-FPS = 60
+FPS = 60  # simulation ticks per second (drawing runs at utils.RENDER_FPS)
 GRAVITY = 0.5
 JUMP_STRENGTH = -15
 
+# Fewest platforms kept alive at once (more are spawned as they come into view)
+PLATFORM_COUNT = 6
+
+# Bump when a change to the rules would make old replays play out differently
+RULES_VERSION = 2
+
 # Colors
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
 GREEN = (0, 200, 0)
 BLUE = (50, 150, 255)
 
-class Player(pygame.sprite.Sprite):
+class Player(pygame.sprite.DirtySprite):
     def __init__(self, x, y):
         super().__init__()
-        self.image = pygame.Surface((40, 40))
-        self.image.fill(BLUE)
-        self.rect = self.image.get_rect(center=(x, y))
+        self.image = assets.filled(__name__, BLUE, (PLAYER_SIZE, PLAYER_SIZE))
+        self.world = self.image.get_rect(center=(x, y))  # see JumperGame
+        self.rect = self.world.copy()
+        self.prev = self.world.topleft  # before the last tick, for interpolation
         self.vel_y = 0
+        self.dirty = 2  # moves every frame
+
+    def update(self, left=False, right=False):
+        self.prev = self.world.topleft
 
-    def update(self, keys):
         # Horizontal movement
-        if keys[pygame.K_LEFT]:
-            self.rect.x -= 7
-        if keys[pygame.K_RIGHT]:
-            self.rect.x += 7
+        if left:
+            self.world.x -= 7
+        if right:
+            self.world.x += 7
 
         # Gravity
         self.vel_y += GRAVITY
-        self.rect.y += self.vel_y
+        self.world.y += self.vel_y
 
         # Wrap around screen
-        if self.rect.right < 0:
-            self.rect.left = WIDTH
-        elif self.rect.left > WIDTH:
-            self.rect.right = 0
+        if self.world.right < 0:
+            self.world.left = WIDTH
+        elif self.world.left > WIDTH:
+            self.world.right = 0
+
+# One pre-rendered surface per (color, size), shared by every platform
+def platform_surface(color, w, h):
+    return assets.filled(__name__, color, (w, h))
+
+
+class Platform(pygame.sprite.DirtySprite):
+    COLOR = GREEN
 
-class Platform(pygame.sprite.Sprite):
     def __init__(self, x, y, w=100, h=10):
         super().__init__()
-        self.image = pygame.Surface((w, h))
-        self.image.fill(GREEN)
-        self.rect = self.image.get_rect(topleft=(x, y))
+        self.image = platform_surface(self.COLOR, w, h)
+        self.world = self.image.get_rect(topleft=(x, y))  # see JumperGame
+        self.rect = self.world.copy()
+
+    def place(self, x, y):
+        """Reuse this platform at a new position (see PlatformPool)."""
+        self.world.topleft = (x, y)
+        self.dirty = 1
 
 class MovingPlatform(Platform):
+    COLOR = (255, 255, 0) #yellow for moving horizontal platforms
+
     def __init__(self, x, y, w=100, h=10, speed=2):
         super().__init__(x, y, w, h)
         self.speed = speed
-        self.image.fill((255, 255, 0)) #yellow for moving horizontal platforms
+        self.prev_x = x
+        self.dirty = 2
+
+    def place(self, x, y, speed=2):
+        super().place(x, y)
+        self.speed = speed
+        self.prev_x = x
+        self.dirty = 2
 
-    def update(self, keys=None):  # ignore player input
-        self.rect.x += self.speed
+    def update(self):
+        self.prev_x = self.world.x
+        self.world.x += self.speed
         # Bounce at edges
-        if self.rect.left < 0 or self.rect.right > WIDTH:
+        if self.world.left < 0 or self.world.right > WIDTH:
             self.speed = -self.speed
 
 class BreakablePlatform(Platform):
+    COLOR = (200, 0, 0)  # red for breakable platforms
+
     def __init__(self, x, y, w=100, h=10):
         super().__init__(x, y, w, h)
-        self.image.fill((200, 0, 0))  # red for breakable platforms
         self.broken = False
 
-    def break_platform(self, platforms, all_sprites):
-        if not self.broken:
-            self.broken = True
-            platforms.remove(self)
-            all_sprites.remove(self)
-
-
-def run_game(screen):
-    clock = pygame.time.Clock()
-    font = pygame.font.SysFont("arial", 24)
-    high_scores = load_high_scores()
-
-    # Groups
-    all_sprites = pygame.sprite.Group()
-    platforms = pygame.sprite.Group()
-    last_platform = None
-
-    # Player
-    player = Player(WIDTH//2, HEIGHT-100)
-    all_sprites.add(player)
-
-    #starting platform
-    start_platform = Platform(WIDTH//2 - 50, HEIGHT - 50, 100, 10)
-    all_sprites.add(start_platform)
-    platforms.add(start_platform)
-
-    # Initial platforms
-    for i in range(6):
-        p = Platform(random.randint(0, WIDTH-100), i * 60)
-        all_sprites.add(p)
-        platforms.add(p)
-
-    score = 0
-    running = True
-    while running:
-        keys = pygame.key.get_pressed()
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+    def place(self, x, y):
+        super().place(x, y)
+        self.broken = False
+
+
+class PlatformPool:
+    """Recycles platforms that left the screen or broke, so a long climb stops allocating."""
+
+    def __init__(self):
+        self.free = {}  # class -> released platforms
+        self.created = 0
+        self.reused = 0
+
+    def spawn(self, cls, x, y):
+        free = self.free.get(cls)
+        if free:
+            self.reused += 1
+            plat = free.pop()
+            plat.place(x, y)
+            return plat
+        self.created += 1
+        return cls(x, y)
+
+    def release(self, plat):
+        plat.kill()
+        self.free.setdefault(type(plat), []).append(plat)
+
+
+# ---------------- COURSE GENERATION ----------------
+PLATFORM_W, PLATFORM_H = 100, 10
+PLAYER_SIZE = 40
+PLAYER_SPEED = 7
+
+STATIC, MOVING, BREAKABLE = "static", "moving", "breakable"
+PLATFORM_KINDS = {STATIC: Platform, MOVING: MovingPlatform, BREAKABLE: BreakablePlatform}
+
+# Platforms generated at once, and how many chunks are kept ready ahead
+CHUNK_SIZE = 16
+LOOKAHEAD_CHUNKS = 2
+
+
+def _jump_heights():
+    # Feet height above the take-off platform on each frame of a jump (rounded like Player.update)
+    rect = pygame.Rect(0, 0, PLAYER_SIZE, PLAYER_SIZE)
+    vel = JUMP_STRENGTH
+    heights = []
+    while True:
+        vel += GRAVITY
+        rect.y += vel
+        if rect.y > 0:
+            return heights
+        heights.append(-rect.y)
+
+
+_HEIGHTS = _jump_heights()
+MAX_RISE = max(_HEIGHTS)
+
+# Largest gap the generator uses, with some slack below the physical limit
+MAX_GAP = MAX_RISE * 9 // 10
+
+
+def _reach(gap):
+    # Frames until the last one still at or above the target, all of them
+    # usable for steering, plus the overlap a landing allows
+    frames = max(t for t, h in enumerate(_HEIGHTS) if h >= gap) + 1
+    return PLAYER_SPEED * frames * 8 // 10 + (PLATFORM_W + PLAYER_SIZE) // 2
+
+
+# Horizontal distance between platform lefts that can still be jumped, by gap
+REACH = [_reach(gap) for gap in range(MAX_GAP + 1)]
+
+
+# Platform numbers at which the classic curve brings in hazards
+MOVING_FROM, BREAKABLE_FROM = 30, 45
+
+
+def classic_curve(n, moving_from=MOVING_FROM, breakable_from=BREAKABLE_FROM):
+    """The original ramp: moving platforms from the 30th, breakable ones from the 45th."""
+    if n >= breakable_from:
+        return 50, 120, 0.2, 0.5
+    if n >= moving_from:
+        return 50, 120, 0.3, 0.0
+    return 50, 120, 0.0, 0.0
+
+
+def steady_curve(n):
+    """Gaps and hazards grow smoothly over the first 200 platforms."""
+    t = min(n / 200, 1.0)
+    return 50 + int(40 * t), 120 + int(80 * t), 0.3 * t, 0.4 * t
+
+
+# A curve maps the platform number to (gap_min, gap_max, p_moving,
+# p_breakable). Add new ones at the end: replays store the index.
+DIFFICULTY_CURVES = {
+    "classic": classic_curve,
+    "steady": steady_curve,
+}
+
+
+def replay_variant(curve, height=0):
+    """A replay's variant: the curve's index, plus 256 per platform of starting height."""
+    return list(DIFFICULTY_CURVES).index(curve) + 256 * height
+
+
+class CourseGenerator:
+    """Streams a seed's course as (kind, x, y), each platform reachable from the last.
+
+    Made a chunk at a time: prefetch() keeps LOOKAHEAD_CHUNKS ready, next() pops.
+    """
+
+    def __init__(self, seed, curve=classic_curve, chunk_size=CHUNK_SIZE,
+                 lookahead=LOOKAHEAD_CHUNKS, first=0):
+        self.rng = random.Random(seed)
+        self.curve = curve
+        self.chunk_size = chunk_size
+        self.lookahead = lookahead * chunk_size
+        self.buffer = deque()
+        self.count = first  # platform number, which the curve is read at
+        self.chunks = 0
+        self.last = None
+
+    def _generate(self):
+        n = self.count
+        self.count += 1
+        if self.last is None:
+            # Starting platform, under the player
+            return (STATIC, WIDTH // 2 - PLATFORM_W // 2, HEIGHT - 50)
+
+        rng = self.rng
+        gap_min, gap_max, p_moving, p_breakable = self.curve(n)
+        gap_max = min(gap_max, MAX_GAP)
+        gap = rng.randint(min(gap_min, gap_max), gap_max)
+
+        last_kind, last_x, last_y = self.last
+        if last_kind == MOVING:
+            low, high = 0, WIDTH - PLATFORM_W
+        else:
+            low = max(0, last_x - REACH[gap])
+            high = min(WIDTH - PLATFORM_W, last_x + REACH[gap])
+        x = rng.randint(low, high)
+
+        roll = rng.random()
+        if roll < p_breakable:
+            kind = BREAKABLE
+        elif roll < p_breakable + p_moving and last_kind != BREAKABLE:
+            kind = MOVING
+        else:
+            kind = STATIC
+        return (kind, x, last_y - gap)
+
+    def generate_chunk(self):
+        for _ in range(self.chunk_size):
+            self.last = self._generate()
+            self.buffer.append(self.last)
+        self.chunks += 1
+
+    def prefetch(self):
+        """Generate a chunk if fewer than the look-ahead are buffered."""
+        if len(self.buffer) < self.lookahead:
+            self.generate_chunk()
+
+    def next(self):
+        if not self.buffer:
+            self.generate_chunk()
+        return self.buffer.popleft()
+
+
+class JumperGame:
+    """Jumper rules without drawing or input polling.
+
+    Positions are world coordinates under camera_y; height starts the game that many platforms up.
+    """
+
+    def __init__(self, seed=None, all_sprites=None, profiler=NULL_PROFILER,
+                 platform_count=PLATFORM_COUNT, curve="classic", height=0):
+        self.all_sprites = pygame.sprite.LayeredDirty() if all_sprites is None else all_sprites
+        self.profiler = profiler
+        self.platform_count = platform_count
+        self.curve = curve
+        self.height = height
+        self.platforms = deque()
+        self.pool = PlatformPool()
+        self.player = None
+        self.on_break = None
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.seed = seed
+        self.course = CourseGenerator(seed, DIFFICULTY_CURVES[self.curve], first=self.height)
+        if self.player is not None:
+            self.player.kill()
+        while self.platforms:
+            self._release(self.platforms.pop())
+        self.last_platform = None
+        self.camera_y = self.prev_camera_y = 0.0
+        self.view_top = 0  # world y at the top of the screen as last drawn
+
+        # Player
+        self.player = Player(WIDTH//2, HEIGHT-100)
+        self.all_sprites.add(self.player)
+
+        #starting platform and the ones above it
+        self._spawn_ahead()
+
+        self.score = self.height
+        self.ticks = 0
+        self.alive = True
+
+    def _spawn_ahead(self):
+        # The course goes upwards, so platforms are appended bottom to top
+        platforms = self.platforms
+        while (len(platforms) < self.platform_count
+               or platforms[-1].world.y > self.camera_y - HEIGHT // 2):
+            kind, x, y = self.course.next()
+            plat = self.pool.spawn(PLATFORM_KINDS[kind], x, y)
+            platforms.append(plat)
+            self.all_sprites.add(plat)
+
+    def _release(self, plat):
+        # A recycled platform must score again when it comes back
+        if plat is self.last_platform:
+            self.last_platform = None
+        self.pool.release(plat)
+
+    def apply_camera(self, alpha=1.0):
+        """Place the sprites on screen, alpha of the way from the previous tick to the last."""
+        camera = lerp(self.prev_camera_y, self.camera_y, alpha)
+        top = self.view_top = round(camera)
+        player = self.player
+        x = player.world.x
+        if abs(x - player.prev[0]) < WIDTH // 2:  # not across a screen wrap
+            x = round(lerp(player.prev[0], x, alpha))
+        player.rect.topleft = (x, round(lerp(player.prev[1], player.world.y, alpha)) - top)
+        for plat in self.platforms:
+            x = plat.world.x
+            if isinstance(plat, MovingPlatform):
+                x = round(lerp(plat.prev_x, x, alpha))
+            pos = (x, plat.world.y - top)
+            if plat.rect.topleft != pos:
+                plat.rect.topleft = pos
+                if not plat.dirty:
+                    plat.dirty = 1
+
+    def step(self, left=False, right=False):
+        """Advance one tick with the given keys held. Returns True while alive."""
+        if not self.alive:
+            return False
+        self.ticks += 1
+        self.prev_camera_y = self.camera_y
+        player = self.player
+        world = player.world
+        platforms = self.platforms
 
         # Update
-        all_sprites.update(keys)
+        player.update(left, right)
+        for plat in platforms:
+            plat.update()
+        self.profiler.lap("update")
 
-        # Collision: bounce on platform
+        # Collision: bounce on the lowest platform touched
         if player.vel_y > 0:  # falling
-            hits = pygame.sprite.spritecollide(player, platforms, False)
-            if hits:
-                lowest = hits[0]
-                if player.rect.bottom <= lowest.rect.bottom + 10:
-                    if last_platform != lowest:
-                        score += 1
-                        last_platform = lowest
-                    player.rect.bottom = lowest.rect.top
+            for lowest in platforms:
+                if not world.colliderect(lowest.world):
+                    continue
+                if world.bottom <= lowest.world.bottom + 10:
+                    if self.last_platform != lowest:
+                        self.score += 1
+                        self.last_platform = lowest
+                    world.bottom = lowest.world.top
                     player.vel_y = JUMP_STRENGTH
 
                     #if its a breakable platform, remove it after touching
                     if isinstance(lowest, BreakablePlatform):
-                        lowest.break_platform(platforms, all_sprites)
+                        lowest.broken = True
+                        if self.on_break is not None:
+                            self.on_break(lowest.world, lowest.COLOR)
+                        platforms.remove(lowest)
+                        self._release(lowest)
+                break
+
+        self.profiler.lap("collision")
 
         # Scroll screen when player reaches top third
-        if player.rect.top <= HEIGHT // 3:
-            player.rect.y += abs(player.vel_y)
-            for plat in platforms:
-                plat.rect.y += abs(player.vel_y)
-                if plat.rect.top >= HEIGHT:
-                    plat.kill()
-
-        #ensure there are at least 6 platforms above the player    
-        while len(platforms) < 6:
-            highest_y = min(p.rect.y for p in platforms)  # top-most platform
-            new_y = highest_y - random.randint(50, 120)   # spawn above highest
-            
-            #place new platform not too horizontal from center
-            player_x = player.rect.centerx
-            new_x = random.randint(max(0, player_x - 150), min(WIDTH-100, player_x +150))
-            
-            # After score 30
-            if score >= 45: 
-                roll = random.random()
-                if roll < 0.5: #50% chance 
-                    new_p = BreakablePlatform(new_x, new_y)
-                elif roll < 0.7: #next 20% chance
-                    new_p = MovingPlatform(new_x, new_y)
-                else:
-                    new_p = Platform(new_x, new_y)
-            elif score >= 30:
-                if random.random() < 0.3:  # 30% chance after 30 points
-                    new_p = MovingPlatform(new_x, new_y)
-                else:
-                    new_p = Platform(new_x, new_y)
-            else:
-                new_p = Platform(new_x, new_y)
+        if world.top - self.camera_y <= HEIGHT // 3:
+            self.camera_y -= abs(player.vel_y)
 
-            platforms.add(new_p)
-            all_sprites.add(new_p)                
+        # Platforms that left the bottom of the screen are always the lowest
+        bottom = self.camera_y + HEIGHT
+        while platforms and platforms[0].world.top >= bottom:
+            self._release(platforms.popleft())
 
-        # Draw
-        screen.fill(BLACK)
-        all_sprites.draw(screen)
-        score_text = font.render(f"Score: {score}", True, WHITE)
-        screen.blit(score_text, (10,10))
-        pygame.display.flip()
+        self.profiler.lap("scroll")
 
-        clock.tick(FPS)
+        # Platforms come into play half a screen before they are visible
+        self._spawn_ahead()
 
+        self.profiler.lap("spawn")
 
         # Game Over if fall
-        if player.rect.top > HEIGHT:
-            running = False
-
-        
-    
-
-    # ---------------- GAME OVER SCREEN ----------------
-    screen.fill(BLACK)
-    big_font = pygame.font.SysFont("arial", 36)
-    final_score = font.render(f"YOU REACHED {score} HEIGHT!", True, WHITE)
-    screen.blit(final_score, (WIDTH // 2 - final_score.get_width() // 2, 100))
-    pygame.display.flip()
-    pygame.time.wait(1000)
-
-    # Check if player made top 5
-    high_scores.append(("YOU", score))  # placeholder
-    high_scores = sorted(high_scores, key=lambda x: x[1], reverse=True)[:5]
-    
-    if any(init == "YOU" and sc == score for init, sc in high_scores):
-        rank = [s for s in high_scores].index(("YOU", score)) + 1
-
-        if rank == 1:
-            congrats = big_font.render("NEW HIGH SCORE!", True, GREEN)
-            screen.blit(congrats, (WIDTH // 2 - congrats.get_width() // 2, 150))
-            pygame.display.flip()
-            pygame.time.wait(1500)
-
-        initials = get_initials(screen, font)
-        # Replace placeholder
-        for i, (init, sc) in enumerate(high_scores):
-            if sc == score and init == "YOU":
-                high_scores[i] = (initials, score)
+        if world.top - self.camera_y > HEIGHT:
+            self.alive = False
+        return self.alive
+
+
+def preload_assets():
+    """Make Jumper's surfaces and fonts before its first frame (see assets.py)."""
+    assets.filled(__name__, BLUE, (PLAYER_SIZE, PLAYER_SIZE))
+    for cls in PLATFORM_KINDS.values():
+        platform_surface(cls.COLOR, PLATFORM_W, PLATFORM_H)
+    for size in (24, 36, 48):
+        get_font("arial", size)
+
+
+assets.register(__name__, preload_assets)
+
+
+class GameScene(PlayScene):
+    """Jumper, from the first jump to the leaderboard and round again."""
+
+    name = "jumper"
+    title = "Jumper"
+    tick_rate = FPS
+
+    def __init__(self, seed=None, curve="classic", height=0):
+        self.seed = seed
+        self.curve = curve
+        self.height = height
+        self.font = get_font("arial", 24)
+        self.board = get_leaderboard()
+        self.board.preload("jumper")
+
+    def start(self):
+        super().start()
+        self.particles = particle_system(self.manager.screen)
+        self.game = None
+
+        # Score on a layer above the sprites
+        self.score_text = TextSprite(self.font, WHITE, topleft=(10, 10))
+        self.renderer.sprites.add(self.score_text, layer=1)
+        self.new_game()
+
+    def new_game(self):
+        """Start a game, reusing the sprites and platforms of the last one."""
+        seed = replay.new_seed() if self.seed is None else self.seed
+        if self.game is None:
+            self.game = JumperGame(seed, self.renderer.sprites, self.profiler, curve=self.curve,
+                                   height=self.height)
+            if self.particles is not None:
+                self.game.on_break = self.particles.burst
+        else:
+            self.game.reset(seed)
+        game = self.game
+        self.recording = replay.Replay("jumper", game.seed, replay_variant(self.curve, self.height),
+                                       RULES_VERSION)
+        if self.particles is not None:
+            self.particles.clear()
+        self.renderer.invalidate()
+        self.loop.reset()
+        self.started = pygame.time.get_ticks()
+
+    def handle_events(self, events):
+        self.profiler.start()
+        for event in events:
+            self.profiler.handle_event(event)
+
+    def update(self):
+        game, particles = self.game, self.particles
+        keys = self.keys()
+        left, right = keys[pygame.K_LEFT], keys[pygame.K_RIGHT]
+        self.profiler.lap("events")
+        for _ in range(self.loop.due()):
+            self.recording.record(replay.input_bits(left=left, right=right))
+            if not game.step(left, right):
                 break
-        save_high_scores(high_scores)
-
-    # ---------------- SHOW LEADERBOARD ----------------
-    screen.fill(BLACK)
-    leader_title = big_font.render("TOP 5 HEIGHTS", True, WHITE)
-    screen.blit(leader_title, (WIDTH // 2 - leader_title.get_width() // 2, 40))
-
-    y_offset = 100
-    for i, (init, sc) in enumerate(high_scores, start=1):
-        hs_text = font.render(f"{i}. {init}  {sc}", True, WHITE)
-        screen.blit(hs_text, (WIDTH // 2 - hs_text.get_width() // 2, y_offset))
-        y_offset += 40
-
-    retry_msg = font.render("Press Enter to Play Again", True, WHITE)
-    quit_msg = font.render("Press Esc to Return to Menu", True, WHITE)
-    screen.blit(retry_msg, (WIDTH // 2 - retry_msg.get_width() // 2, y_offset + 20))
-    screen.blit(quit_msg, (WIDTH // 2 - quit_msg.get_width() // 2, y_offset + 60))
-    pygame.display.flip()
-
-    # ---------------- WAIT FOR INPUT ----------------
-    waiting = True
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_RETURN:  # restart
-                    waiting = False
-                elif event.key == pygame.K_ESCAPE:  # back to menu
-                    return
-        clock.tick(15)
-
-        
+            if particles is not None:
+                particles.update()
+
+    def draw(self):
+        game, particles, renderer, profiler = self.game, self.particles, self.renderer, self.profiler
+        game.apply_camera(self.loop.alpha)
+        self.score_text.set_text(f"Score: {game.score}")
+        if particles is not None and not renderer.full_redraw:
+            particles.erase(renderer.sprites)
+        renderer.draw()
+        # Particles are in world coordinates, drawn straight onto the screen
+        if particles is not None and particles.draw((0, game.view_top)):
+            renderer.mark(particles.drawn)
+        profiler.lap("draw")
+        renderer.present()
+        profiler.lap("present")
+        # The course is extended once the frame is out, if there is time left
+        if profiler.slack_ns() > 0:
+            game.course.prefetch()
+        profiler.lap("prefetch")
+        profiler.end()
+        if not game.alive:
+            self.game_over()
+
+    def game_over(self):
+        score = self.game.score
+        self.board.save_replay("jumper", score, self.recording.to_bytes(score))
+        self.board.record_session("jumper", score, (pygame.time.get_ticks() - self.started) / 1000)
+
+        def show_result(screen):
+            screen.fill(BLACK)
+            final_score = render_text(self.font, f"YOU REACHED {score} HEIGHT!", WHITE)
+            screen.blit(final_score, (WIDTH // 2 - final_score.get_width() // 2, 100))
+
+        self.manager.push(GameOver(self.board, "jumper", score, show_result, self.font,
+                                   get_font("arial", 36), "TOP 5 HEIGHTS",
+                                   congrats=("NEW HIGH SCORE!", GREEN, 150)))
+
+    def resume(self, again=False):
+        if again:
+            self.new_game()
+        else:
+            self.manager.pop()  # back to difficulty select
+
+
+class CurveSelect(Scene):
+    """Pick a difficulty curve and play it with play(curve=name)."""
+
+    idle = True
+
+    def __init__(self, play):
+        self.play = play
+        self.font = get_font("arial", 32)
+        self.options = list(DIFFICULTY_CURVES) + ["Back"]
+        self.selected = 0
+        self.drawn = None  # selection on screen
+
+    def handle_event(self, event):
+        if event.type != pygame.KEYDOWN:
+            return
+        if event.key == pygame.K_UP:
+            self.selected = (self.selected - 1) % len(self.options)
+        elif event.key == pygame.K_DOWN:
+            self.selected = (self.selected + 1) % len(self.options)
+        elif event.key == pygame.K_RETURN:
+            if self.selected == len(self.options) - 1:
+                self.manager.pop()
+            else:
+                self.manager.push(self.play(curve=self.options[self.selected]))
+
+    def resume(self, result=None):
+        self.drawn = None  # the game drew over the list
+
+    def draw(self):
+        if self.selected == self.drawn:
+            return
+        self.drawn = self.selected
+        screen = self.manager.screen
+        screen.fill(BLACK)
+        title = render_text(self.font, "Choose a Difficulty", WHITE)
+        screen.blit(title, (WIDTH//2 - title.get_width()//2, 40))
+        for row, option in enumerate(self.options):
+            color = GREEN if row == self.selected else WHITE
+            text = render_text(self.font, option.capitalize(), color)
+            screen.blit(text, (WIDTH//2 - text.get_width()//2, 100 + row*40))
+        pygame.display.flip()
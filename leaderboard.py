@@ -0,0 +1,401 @@
+import atexit
+import bisect
+from array import array
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+# Another file: ARCADE_SCORES=test.db python3 main.py
+DB_PATH = os.environ.get("ARCADE_SCORES", "arcade_scores.db")
+
+# Old per-game text files, imported once the first time the store is opened
+LEGACY_FILES = {
+    "python": "highscores.txt",
+    "jumper": "highscores_jumper.txt",
+}
+
+# Initials stored for scores that did not make the board
+ANONYMOUS = "---"
+
+log = logging.getLogger(__name__)
+
+# Lengths of the periods top() can filter on, in seconds
+PERIODS = {
+    "day": 24 * 60 * 60,
+    "week": 7 * 24 * 60 * 60,
+    "month": 30 * 24 * 60 * 60,
+}
+
+# Best scores per game kept in memory, so the game-over screens never read the disk
+CACHE_SIZE = 50
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS scores ("
+    " id INTEGER PRIMARY KEY,"
+    " game TEXT NOT NULL,"
+    " initials TEXT NOT NULL,"
+    " score INTEGER NOT NULL,"
+    " created REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS scores_by_rank ON scores (game, score DESC, id)",
+    "CREATE TABLE IF NOT EXISTS sessions ("
+    " id INTEGER PRIMARY KEY,"
+    " game TEXT NOT NULL,"
+    " score INTEGER NOT NULL,"
+    " seconds REAL NOT NULL,"
+    " created REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS stats ("
+    " game TEXT PRIMARY KEY,"
+    " plays INTEGER NOT NULL,"
+    " seconds REAL NOT NULL,"
+    " best INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS replays ("
+    " id INTEGER PRIMARY KEY,"
+    " game TEXT NOT NULL,"
+    " score INTEGER NOT NULL,"
+    " created REAL NOT NULL,"
+    " data BLOB NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS migrations (source TEXT PRIMARY KEY)",
+]
+
+_STOP = object()
+
+
+class BackgroundWriter:
+    """Runs database writes on a worker thread.
+
+    submit() only puts the statement on a queue. The worker drains
+    everything that is waiting and writes it as one transaction, so a
+    burst of writes costs a single commit. Writes submitted with the same
+    key replace each other while queued (only the latest one is written).
+    Whatever is still queued is written at interpreter exit. A batch that
+    fails is logged and dropped, and later writes go on as usual.
+    """
+
+    def __init__(self, path, batch_size=256):
+        self.path = path
+        self.batch_size = batch_size
+        self.queue = queue.Queue()
+
+        self.flushes = 0
+        self.written = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="arcade-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, sql, params=(), key=None):
+        self.queue.put((sql, params, key))
+
+    def depth(self):
+        """Writes waiting to be flushed."""
+        return self.queue.qsize()
+
+    def flush(self):
+        """Block until everything submitted so far is written (or failed).
+
+        Returns at once if the writer thread is no longer running, so
+        nothing waits forever on writes nobody will make.
+        """
+        done = self.queue.all_tasks_done
+        with done:
+            while self.queue.unfinished_tasks and self._thread.is_alive():
+                done.wait(0.1)
+
+    def close(self):
+        if self._thread.is_alive():
+            self.queue.put(_STOP)
+            self._thread.join()
+
+    def stats(self):
+        return {
+            "queue_depth": self.depth(),
+            "flushes": self.flushes,
+            "written": self.written,
+            "coalesced": self.coalesced,
+            "failed": self.failed,
+            "last_flush_ms": self.last_flush_ms,
+            "max_flush_ms": self.max_flush_ms,
+        }
+
+    def _run(self):
+        db = sqlite3.connect(self.path)
+        db.execute("PRAGMA journal_mode=WAL")
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            # Keyed writes: keep only the latest of each key, in its place
+            writes = {}
+            for item in batch:
+                if item is _STOP:
+                    running = False
+                    continue
+                sql, params, key = item
+                if key is not None and key in writes:
+                    del writes[key]
+                    self.coalesced += 1
+                writes[key if key is not None else object()] = (sql, params)
+
+            # A failed batch is rolled back and dropped; the writer carries on
+            start = time.perf_counter()
+            try:
+                with db:
+                    for sql, params in writes.values():
+                        db.execute(sql, params)
+            except Exception:
+                log.exception("dropped %d score writes", len(writes))
+                self.failed += len(writes)
+            else:
+                elapsed = (time.perf_counter() - start) * 1000
+                self.flushes += 1
+                self.written += len(writes)
+                self.last_flush_ms = elapsed
+                self.max_flush_ms = max(self.max_flush_ms, elapsed)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+        db.close()
+
+
+class Leaderboard:
+    """Scores for every game in one SQLite database.
+
+    Every score is its own row, so the whole history is kept and a board
+    is just a query. Each write is one transaction in a WAL-journaled
+    database, so a crash mid-save never leaves a truncated file behind.
+    The (game, score) index serves the top-N queries.
+
+    rank() answers from the cache of best scores, and past it from every
+    score of the game kept sorted in memory (8 bytes each, read once when
+    first needed and kept up to date by add()), so it is a binary search,
+    O(log n), however long the history gets.
+
+    With background=True, writes go through a BackgroundWriter and the
+    best CACHE_SIZE scores of each game are answered from memory, so
+    recording a score never waits for the disk.
+    """
+
+    def __init__(self, path=DB_PATH, background=False):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        with self.db:
+            for statement in SCHEMA:
+                self.db.execute(statement)
+
+        self.writer = BackgroundWriter(path) if background else None
+        # game -> list of (-score, order, initials), best first
+        self._top = {}
+        # game -> array of every score, lowest first (see rank)
+        self._scores = {}
+        self._order = 0
+        self._stats = {}
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.db.close()
+
+    def _write(self, sql, params, key=None):
+        if self.writer is None:
+            with self.db:
+                self.db.execute(sql, params)
+        else:
+            self.writer.submit(sql, params, key)
+
+    def _cached(self, game):
+        top = self._top.get(game)
+        if top is None:
+            rows = self.db.execute(
+                "SELECT initials, score FROM scores WHERE game = ? "
+                "ORDER BY score DESC, id LIMIT ?",
+                (game, CACHE_SIZE),
+            ).fetchall()
+            top = self._top[game] = []
+            for initials, score in rows:
+                self._order += 1
+                top.append((-score, self._order, initials))
+        return top
+
+    def preload(self, game):
+        """Read a game's best scores and stats now, e.g. when it starts."""
+        self._cached(game)
+        self.stats(game)
+
+    def add(self, game, initials, score, created=None):
+        top = self._cached(game)
+        self._order += 1
+        bisect.insort(top, (-score, self._order, initials))
+        del top[CACHE_SIZE:]
+        scores = self._scores.get(game)
+        if scores is not None:
+            bisect.insort(scores, score)
+        self._write(
+            "INSERT INTO scores (game, initials, score, created) VALUES (?, ?, ?, ?)",
+            (game, initials, score, time.time() if created is None else created),
+        )
+
+    def _all_scores(self, game):
+        scores = self._scores.get(game)
+        if scores is None:
+            if self.writer is not None:
+                self.writer.flush()
+            rows = self.db.execute(
+                "SELECT score FROM scores WHERE game = ? ORDER BY score", (game,)
+            )
+            scores = self._scores[game] = array("q", (score for (score,) in rows))
+        return scores
+
+    def rank(self, game, score):
+        """1-based place a new score would take. Ties rank below older scores.
+
+        O(log n): a binary search of the cache, or of all the game's scores
+        for a place below it.
+        """
+        top = self._cached(game)
+        place = bisect.bisect_right(top, (-score, float("inf")))
+        if place < len(top) or len(top) < CACHE_SIZE:
+            return place + 1
+        scores = self._all_scores(game)
+        return len(scores) - bisect.bisect_left(scores, score) + 1
+
+    def makes_top(self, game, score, n=5):
+        """True if score would be in the top n.
+
+        Answered from the cache for small n. Past that the query stops
+        counting after n rows: one index seek plus at most n steps.
+        """
+        if n <= CACHE_SIZE:
+            return bisect.bisect_right(self._cached(game), (-score, float("inf"))) < n
+        if self.writer is not None:
+            self.writer.flush()
+        (better,) = self.db.execute(
+            "SELECT COUNT(*) FROM (SELECT 1 FROM scores WHERE game = ? AND score >= ? LIMIT ?)",
+            (game, score, n),
+        ).fetchone()
+        return better < n
+
+    def top(self, game, n=5, period=None):
+        """Best n (initials, score) pairs, all time or for "day"/"week"/"month"."""
+        if period is None and n <= CACHE_SIZE:
+            return [(initials, -neg) for neg, _, initials in self._cached(game)[:n]]
+
+        if self.writer is not None:
+            self.writer.flush()
+        if period is None:
+            rows = self.db.execute(
+                "SELECT initials, score FROM scores WHERE game = ? "
+                "ORDER BY score DESC, id LIMIT ?",
+                (game, n),
+            )
+        else:
+            rows = self.db.execute(
+                "SELECT initials, score FROM scores WHERE game = ? AND created >= ? "
+                "ORDER BY score DESC, id LIMIT ?",
+                (game, time.time() - PERIODS[period], n),
+            )
+        return rows.fetchall()
+
+    def stats(self, game):
+        """Play count, total seconds played and best score for a game."""
+        stats = self._stats.get(game)
+        if stats is None:
+            row = self.db.execute(
+                "SELECT plays, seconds, best FROM stats WHERE game = ?", (game,)
+            ).fetchone()
+            stats = self._stats[game] = dict(zip(("plays", "seconds", "best"), row or (0, 0.0, 0)))
+        return stats
+
+    def record_session(self, game, score, seconds):
+        """Log one finished game and update the game's running stats."""
+        stats = self.stats(game)
+        stats["plays"] += 1
+        stats["seconds"] += seconds
+        stats["best"] = max(stats["best"], score)
+        self._write(
+            "INSERT INTO sessions (game, score, seconds, created) VALUES (?, ?, ?, ?)",
+            (game, score, seconds, time.time()),
+        )
+        # Only the latest totals matter, so queued updates coalesce
+        self._write(
+            "INSERT OR REPLACE INTO stats (game, plays, seconds, best) VALUES (?, ?, ?, ?)",
+            (game, stats["plays"], stats["seconds"], stats["best"]),
+            key=("stats", game),
+        )
+
+    def save_replay(self, game, score, data):
+        """Keep the encoded replay (see replay.py) of a finished game."""
+        self._write(
+            "INSERT INTO replays (game, score, created, data) VALUES (?, ?, ?, ?)",
+            (game, score, time.time(), data),
+        )
+
+    def replays(self, game=None):
+        """(id, data) of every stored replay, oldest first."""
+        if self.writer is not None:
+            self.writer.flush()
+        if game is None:
+            return self.db.execute("SELECT id, data FROM replays ORDER BY id").fetchall()
+        return self.db.execute(
+            "SELECT id, data FROM replays WHERE game = ? ORDER BY id", (game,)
+        ).fetchall()
+
+    def replay(self, replay_id):
+        """Encoded replay with the given id, or None."""
+        if self.writer is not None:
+            self.writer.flush()
+        row = self.db.execute("SELECT data FROM replays WHERE id = ?", (replay_id,)).fetchone()
+        return row and row[0]
+
+    def migrate(self, game, path):
+        """Import an old "INI score" text file once. Returns rows imported."""
+        if not os.path.exists(path):
+            return 0
+        source = os.path.abspath(path)
+        if self.db.execute("SELECT 1 FROM migrations WHERE source = ?", (source,)).fetchone():
+            return 0
+
+        created = os.path.getmtime(path)
+        rows = []
+        with open(path, "r") as f:
+            for line in f:
+                parts = line.strip().split()
+                if len(parts) == 2 and parts[1].isdigit():
+                    rows.append((game, parts[0], int(parts[1]), created))
+
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO scores (game, initials, score, created) VALUES (?, ?, ?, ?)", rows
+            )
+            self.db.execute("INSERT INTO migrations (source) VALUES (?)", (source,))
+        self._top.pop(game, None)
+        self._scores.pop(game, None)
+        return len(rows)
+
+
+_board = None
+
+
+def get_leaderboard():
+    """The shared leaderboard, opened (and migrated) on first use.
+
+    Its writes happen on a background thread.
+    """
+    global _board
+    if _board is None:
+        _board = Leaderboard(background=True)
+        for game, path in LEGACY_FILES.items():
+            _board.migrate(game, path)
+    return _board
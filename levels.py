@@ -0,0 +1,234 @@
+"""Brick Breaker level packs.
+
+A pack is a text file with any number of levels. Each level is a
+"= name" line followed by its rows, one character per brick:
+
+    ; comment
+    = Tough Core
+    1112222211
+    12333#3211
+
+    ' ' or '.'  empty (a row with no bricks needs dots; blank lines are skipped)
+    1 .. 9      brick that takes that many hits
+    #           steel brick, never breaks
+    *           multi-ball brick: one hit, splits every ball in three
+
+Rows can be up to MAX_COLS wide and a level up to MAX_ROWS tall; Brick
+Breaker shrinks the bricks of grids larger than its default to fit.
+
+The first time a pack is loaded it is compiled into a binary file next
+to it (classic.txt -> classic.bin): a small index of names and grid
+sizes, then per level four byte arrays (column, row, hits, kind). Later
+loads only read the index; a level is decoded when it is played, so
+listing hundreds of levels parses none of them. The cache is rebuilt
+whenever the text file changes.
+
+    python3 levels.py PACK ...   # compile packs and list their levels
+"""
+import os
+import struct
+import sys
+from array import array
+
+# Brick kinds
+NORMAL, STEEL, MULTIBALL = 0, 1, 2
+
+_KINDS = {"#": STEEL, "*": MULTIBALL}
+_HITS = {"#": 0, "*": 1}
+
+MAX_COLS = 24
+MAX_ROWS = 12
+
+MAGIC = b"ARCL"
+VERSION = 1
+# version, size and mtime of the source text, level count
+_HEADER = struct.Struct("<BQqI")
+# offset of the level's arrays, brick count, columns, rows, name length
+_ENTRY = struct.Struct("<IHBBB")
+
+
+class Level:
+    """One compiled level: parallel arrays with an entry per brick."""
+
+    def __init__(self, name, cols, rows, col, row, hits, kind):
+        self.name = name
+        self.cols = cols
+        self.rows = rows
+        self.col = col
+        self.row = row
+        self.hits = hits
+        self.kind = kind
+
+    def __len__(self):
+        return len(self.col)
+
+    def bricks(self):
+        """(column, row, hits, kind) of every brick, row by row."""
+        return zip(self.col, self.row, self.hits, self.kind)
+
+
+def parse(text, source="<pack>"):
+    """Levels of a pack's text. Errors name the source and line."""
+    levels = []
+    grid = None
+    for lineno, line in enumerate(text.splitlines(), start=1):
+        if line.startswith(";") or not line.strip():
+            continue
+        if line.startswith("="):
+            grid = []
+            levels.append((line[1:].strip() or f"Level {len(levels) + 1}", grid, lineno))
+            continue
+        if grid is None:
+            raise ValueError(f"{source}:{lineno}: rows before the first '= name' line")
+        if len(line) > MAX_COLS:
+            raise ValueError(f"{source}:{lineno}: row wider than {MAX_COLS} bricks")
+        for ch in line:
+            if ch not in " .#*123456789":
+                raise ValueError(f"{source}:{lineno}: unknown brick {ch!r}")
+        grid.append(line)
+        if len(grid) > MAX_ROWS:
+            raise ValueError(f"{source}:{lineno}: level taller than {MAX_ROWS} rows")
+
+    if not levels:
+        raise ValueError(f"{source}: no levels")
+    compiled = []
+    for name, grid, lineno in levels:
+        col, row, hits, kind = array("B"), array("B"), array("B"), array("B")
+        for r, line in enumerate(grid):
+            for c, ch in enumerate(line):
+                if ch in " .":
+                    continue
+                col.append(c)
+                row.append(r)
+                hits.append(_HITS[ch] if ch in _HITS else int(ch))
+                kind.append(_KINDS.get(ch, NORMAL))
+        if all(k == STEEL for k in kind):
+            raise ValueError(f"{source}:{lineno}: level {name!r} has nothing to break")
+        cols = max((len(line.rstrip()) for line in grid), default=0)
+        compiled.append(Level(name, cols, len(grid), col, row, hits, kind))
+    return compiled
+
+
+def compile_pack(levels, size=0, mtime_ns=0):
+    """The binary form of a list of Levels."""
+    index = bytearray()
+    body = bytearray()
+    for level in levels:
+        name = level.name.encode()[:255]
+        index += _ENTRY.pack(len(body), len(level), level.cols, level.rows, len(name))
+        index += name
+        for values in (level.col, level.row, level.hits, level.kind):
+            body += values.tobytes()
+    return MAGIC + _HEADER.pack(VERSION, size, mtime_ns, len(levels)) + bytes(index) + bytes(body)
+
+
+class LevelPack:
+    """A compiled pack. Only the index is read up front."""
+
+    def __init__(self, data, source="<pack>"):
+        if data[:4] != MAGIC:
+            raise ValueError(f"{source}: not a compiled level pack")
+        version, self.size, self.mtime_ns, count = _HEADER.unpack_from(data, 4)
+        if version != VERSION:
+            raise ValueError(f"{source}: level pack version {version}")
+        self.source = source
+        self._data = memoryview(data)
+        self._levels = {}  # index -> decoded Level
+
+        self.names = []
+        self._entries = []  # (offset, bricks, cols, rows)
+        pos = 4 + _HEADER.size
+        for _ in range(count):
+            offset, bricks, cols, rows, name_len = _ENTRY.unpack_from(data, pos)
+            pos += _ENTRY.size
+            self.names.append(bytes(data[pos:pos + name_len]).decode())
+            pos += name_len
+            self._entries.append((offset, bricks, cols, rows))
+        self._body = pos
+
+    @classmethod
+    def from_text(cls, text, source="<pack>"):
+        return cls(compile_pack(parse(text, source)), source)
+
+    def __len__(self):
+        return len(self.names)
+
+    def grid(self, index):
+        """(columns, rows, bricks) of a level, without decoding it."""
+        offset, bricks, cols, rows = self._entries[index]
+        return cols, rows, bricks
+
+    def level(self, index):
+        """Decode level index (cached, so restarts cost nothing)."""
+        level = self._levels.get(index)
+        if level is None:
+            offset, bricks, cols, rows = self._entries[index]
+            arrays = []
+            pos = self._body + offset
+            for _ in range(4):
+                values = array("B")
+                values.frombytes(self._data[pos:pos + bricks])
+                arrays.append(values)
+                pos += bricks
+            level = self._levels[index] = Level(self.names[index], cols, rows, *arrays)
+        return level
+
+
+def cache_path(path):
+    return os.path.splitext(path)[0] + ".bin"
+
+
+_packs = {}
+
+
+def load_pack(path):
+    """The pack at path, compiling it if its cache is missing or stale."""
+    pack = _packs.get(path)
+    if pack is not None:
+        return pack
+
+    stat = os.stat(path)
+    cached = cache_path(path)
+    try:
+        with open(cached, "rb") as f:
+            pack = LevelPack(f.read(), cached)
+        if (pack.size, pack.mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+            pack = None
+    except (OSError, ValueError, struct.error):
+        pack = None
+
+    if pack is None:
+        with open(path, encoding="utf-8") as f:
+            data = compile_pack(parse(f.read(), path), stat.st_size, stat.st_mtime_ns)
+        pack = LevelPack(data, path)
+        try:
+            # Written aside and renamed, so a crash never leaves half a cache
+            with open(cached + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(cached + ".tmp", cached)
+        except OSError:
+            pass  # read-only install: compile again next time
+
+    _packs[path] = pack
+    return pack
+
+
+def main(argv):
+    if not argv:
+        print(__doc__)
+        return 2
+    for path in argv:
+        try:
+            pack = load_pack(path)
+        except (OSError, ValueError) as e:
+            print(e)
+            return 1
+        print(f"{path}: {len(pack)} levels -> {cache_path(path)}")
+        for i, name in enumerate(pack.names):
+            cols, rows, bricks = pack.grid(i)
+            print(f"  {i + 1:4}. {name:<30}{cols:>3}x{rows:<3}{bricks:>5} bricks")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
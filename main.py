@@ -1,15 +1,27 @@
+import time
+START_TIME = time.perf_counter()  # for the cold-start report
+
+import importlib
+import os
 import pygame
 import sys
-import python_game
-import jumper
-import brickbreaker
+import assets
+from renderer import Renderer
+from scenes import Scene, SceneManager
+from utils import get_font, render_text
+
+# Print startup timings: ARCADE_TIMING=1 python3 main.py
+TIMING = os.environ.get("ARCADE_TIMING") == "1"
+timings = {"imports": time.perf_counter() - START_TIME}
 
 pygame.init()
+timings["pygame.init"] = time.perf_counter() - START_TIME
 
 # Window setup
 WIDTH, HEIGHT = 600, 400
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Mini Arcade")
+timings["window open"] = time.perf_counter() - START_TIME
 
 # Colors
 WHITE = (255, 255, 255)
@@ -19,72 +31,169 @@ BLUE = (50, 100, 200)
 YELLOW = (240, 200, 0)
 
 # Fonts (try "comicsansms" or "arialblack" for a chunkier style)
-title_font = pygame.font.SysFont("arialblack", 48)
-menu_font = pygame.font.SysFont("arial", 32)
+title_font = get_font("arialblack", 48)
+menu_font = get_font("arial", 32)
+
+class GameEntry:
+    """A game in the menu.
+
+    The module is only imported the first time the game is picked, so
+    startup time does not grow with the number of games. Its surfaces and
+    fonts are preloaded each time it is picked, and evicted when it is
+    left (see assets.py). entry names the Scene class (or function
+    returning one) that plays the game. If selector is set, that scene
+    opens first (e.g. a level select) and is given entry, to push
+    entry(choice) itself.
+    """
+
+    def __init__(self, name, module, entry="GameScene", selector=None):
+        self.name = name
+        self.module_name = module
+        self.entry = entry
+        self.selector = selector
+        self.module = None
+
+    def load(self):
+        if self.module is None:
+            start = time.perf_counter()
+            self.module = importlib.import_module(self.module_name)
+            timings[f"import {self.module_name}"] = time.perf_counter() - start
+            if TIMING:
+                print(f"import {self.module_name}: {timings[f'import {self.module_name}'] * 1000:.1f} ms")
+        return self.module
+
+    def scene(self):
+        module = self.load()
+        seconds = timings[f"preload {self.module_name}"] = assets.preload(self.module_name)
+        if TIMING:
+            print(f"preload {self.module_name}: {seconds * 1000:.1f} ms")
+        entry = getattr(module, self.entry)
+        if self.selector is None:
+            return entry()
+        return getattr(module, self.selector)(entry)
+
+
+GAMES = {}
+
+
+def register_game(name, module, entry="GameScene", selector=None):
+    """Add a game to the menu, after the ones already registered."""
+    GAMES[name] = GameEntry(name, module, entry, selector)
+
+
+register_game("Python", "python_game")
+register_game("Jumper", "jumper", selector="CurveSelect")
+register_game("Brick Breaker", "brickbreaker", selector="LevelSelect")
 
 # Menu options
-options = ["Python", "Jumper", "Brick Breaker", "Quit"]
+options = list(GAMES) + ["Quit"]
 selected = 0
+drawn_selected = None  # selection shown by the last pushed frame
+
+renderer = Renderer(screen, BLUE)
+
+
+def option_rect(i):
+    # Rows shrink to fit once there are more games than the screen holds
+    row = min(60, (HEIGHT - 160) // len(options))
+    return pygame.Rect(WIDTH // 2 - 120, 150 + i * row, 240, row - 10)
+
+
+def option_label(i, color):
+    """Option i's text and where it goes: centred on its highlight box."""
+    text = render_text(menu_font, options[i], color)
+    return text, text.get_rect(center=option_rect(i).center)
+
+
+def option_area(i):
+    """Everything option i draws on; its text can stick out of small rows."""
+    return option_rect(i).union(option_label(i, WHITE)[1])
+
+
+def timing_report():
+    lines = ["Cold start:"]
+    for name, seconds in timings.items():
+        lines.append(f"  {name:<24}{seconds * 1000:8.1f} ms")
+    return "\n".join(lines)
 
 
 def draw_menu():
-    """Draws the arcade menu with visuals."""
+    """Draws the arcade menu with visuals, if the selection changed."""
+    global drawn_selected
+
+    if selected == drawn_selected:
+        return  # the frame on screen is still right
+    # Only the old and new highlight change when the selection moves
+    if not renderer.full_redraw:
+        renderer.mark(option_area(drawn_selected), option_area(selected))
+    drawn_selected = selected
+
     # Background
     screen.fill(BLUE)
 
     # Title
-    title = title_font.render("Mini Arcade", True, YELLOW)
+    title = render_text(title_font, "Mini Arcade", YELLOW)
     screen.blit(title, (WIDTH // 2 - title.get_width() // 2, 40))
 
     # Options
-    for i, option in enumerate(options):
+    for i in range(len(options)):
         # Highlight box
         if i == selected:
             pygame.draw.rect(
                 screen, YELLOW,
-                (WIDTH // 2 - 120, 150 + i * 60, 240, 50),
+                option_rect(i),
                 border_radius=10
             )
 
         # Text
         color = BLACK if i == selected else WHITE
-        text = menu_font.render(option, True, color)
-        screen.blit(text, (WIDTH // 2 - text.get_width() // 2, 160 + i * 60))
-
-    pygame.display.flip()
+        text, where = option_label(i, color)
+        screen.blit(text, where)
+
+    renderer.present()
+
+
+class Menu(Scene):
+    """The arcade menu, at the bottom of the scene stack."""
+
+    idle = True
+    playing = None  # GameEntry of the game on the stack above
+
+    def handle_event(self, event):
+        global selected
+        if event.type != pygame.KEYDOWN:
+            return
+        if event.key == pygame.K_UP:
+            selected = (selected - 1) % len(options)
+        elif event.key == pygame.K_DOWN:
+            selected = (selected + 1) % len(options)
+        elif event.key == pygame.K_RETURN:
+            if options[selected] == "Quit":
+                self.manager.pop()
+            else:
+                self.playing = GAMES[options[selected]]
+                self.manager.push(self.playing.scene())
+
+    def resume(self, result=None):
+        global drawn_selected
+        assets.evict(self.playing.module_name)
+        renderer.invalidate()  # the game drew over the menu
+        drawn_selected = None
+
+    def draw(self):
+        draw_menu()
+        if "first menu frame" not in timings:
+            timings["first menu frame"] = time.perf_counter() - START_TIME
+            if TIMING:
+                print(timing_report())
 
 
 def main_menu():
-    global selected
-    clock = pygame.time.Clock()
-
-    while True:
-        draw_menu()
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    selected = (selected - 1) % len(options)
-                elif event.key == pygame.K_DOWN:
-                    selected = (selected + 1) % len(options)
-                elif event.key == pygame.K_RETURN:
-                    if options[selected] == "Python":
-                        python_game.run_game(screen)    
-                    elif options[selected] == "Jumper":
-                        jumper.run_game(screen)
-                    elif options[selected] == "Brick Breaker":
-                        level = brickbreaker.level_select(screen)
-                        if level is not None:
-                            brickbreaker.run_game(screen, level)
-                    elif options[selected] == "Quit":
-                        pygame.quit()
-                        sys.exit()
-
-        clock.tick(60)
+    manager = SceneManager(screen)
+    manager.push(Menu())
+    manager.run()
+    pygame.quit()
+    sys.exit()
 
 
 if __name__ == "__main__":
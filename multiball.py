@@ -0,0 +1,168 @@
+import math
+
+import numpy as np
+
+# Most balls in play at once; splits beyond this are dropped
+MAX_BALLS = 512
+
+# Children leave a split this far either side of the parent's heading
+SPLIT_ANGLE = math.radians(25)
+_COS, _SIN = math.cos(SPLIT_ANGLE), math.sin(SPLIT_ANGLE)
+
+
+class BallSwarm:
+    """The extra balls of Brick Breaker's multi-ball, as NumPy arrays.
+
+    Every ball is a row in arrays of position and velocity, and move()
+    runs the wall, paddle and brick tests for all of them at once, so a
+    few hundred balls cost a handful of array operations per tick.
+
+    Bricks are found through a cell -> brick lookup over the level grid:
+    nine points on each ball's edges (corners, midpoints, centre) are
+    turned into grid cells and looked up. At BALL_SPEED a ball moves
+    less per tick than the thinnest brick, so this discrete test does not
+    need brickbreaker.Ball's swept collision. A ball that hits a brick is
+    put back where it started the tick and reflected on the axis it came
+    in on.
+
+    layout is (x, y, w, h, step_x, step_y) of the level grid: the top
+    left of its first cell, the brick size and the distance between
+    bricks. bricks[i] sits in cell (col[i], row[i]).
+    """
+
+    def __init__(self, bricks, col, row, layout, cols, rows, image, bounds, max_balls=MAX_BALLS):
+        self.bricks = list(bricks)
+        self.ids = {brick: i for i, brick in enumerate(self.bricks)}
+        self.col = np.asarray(col, dtype=np.int32)
+        self.row = np.asarray(row, dtype=np.int32)
+        self.x0, self.y0, self.w, self.h, self.step_x, self.step_y = layout
+        self.cells = np.full((rows, cols), -1, dtype=np.int32)
+        alive = np.fromiter((b.alive() for b in self.bricks), dtype=bool, count=len(self.bricks))
+        self.cells[self.row[alive], self.col[alive]] = np.nonzero(alive)[0]
+
+        self.image = image
+        self.size = image.get_width()
+        self.width, self.height = bounds
+        self._offsets = np.array([0.0, self.size / 2, self.size - 0.01])
+
+        self.max_balls = max_balls
+        self.count = 0
+        self.pos = np.zeros((max_balls, 2))
+        self.prev = np.zeros((max_balls, 2))  # before the last tick, for interpolation
+        self.vel = np.zeros((max_balls, 2))
+        self.drawn = []  # rects drawn last frame
+
+    def reset(self):
+        """Drop every ball and bring every brick back, to play the level again."""
+        self.count = 0
+        self.drawn = []
+        self.cells[self.row, self.col] = np.arange(len(self.bricks))
+
+    def remove_brick(self, brick):
+        """Forget a destroyed brick (whichever ball destroyed it)."""
+        i = self.ids.get(brick)
+        if i is not None:
+            self.cells[self.row[i], self.col[i]] = -1
+
+    def split(self, parents=()):
+        """Split every ball, and any extra (x, y, vx, vy) parents, in three.
+
+        Each parent keeps going and gains two children turned SPLIT_ANGLE
+        either side of it, which join the swarm. Extra parents (the ball
+        outside the swarm) do not join it themselves.
+        """
+        n = self.count
+        extra = np.array(parents, dtype=float).reshape(-1, 4)
+        pos = np.concatenate([self.pos[:n], extra[:, :2]])
+        vel = np.concatenate([self.vel[:n], extra[:, 2:]])
+        vx, vy = vel[:, 0], vel[:, 1]
+        new_vel = np.concatenate([
+            np.stack([vx * _COS - vy * _SIN, vx * _SIN + vy * _COS], axis=1),
+            np.stack([vx * _COS + vy * _SIN, -vx * _SIN + vy * _COS], axis=1),
+        ])
+        new_pos = np.concatenate([pos, pos])
+        room = min(len(new_pos), self.max_balls - n)
+        self.pos[n:n + room] = self.prev[n:n + room] = new_pos[:room]
+        self.vel[n:n + room] = new_vel[:room]
+        self.count = n + room
+
+    def move(self, paddle):
+        """Advance every ball one tick. Returns the ids of the bricks hit.
+
+        An id appears once per ball that hit it; balls that fell below
+        the screen are removed.
+        """
+        n = self.count
+        if not n:
+            return np.empty(0, dtype=np.int32)
+        pos, vel, prev = self.pos[:n], self.vel[:n], self.prev[:n]
+        size = self.size
+        prev[:] = pos
+        pos += vel
+
+        # Walls (the bottom stays open)
+        x, y = pos[:, 0], pos[:, 1]
+        out = x < 0
+        x[out] = -x[out]
+        vel[out, 0] = np.abs(vel[out, 0])
+        out = x > self.width - size
+        x[out] = 2 * (self.width - size) - x[out]
+        vel[out, 0] = -np.abs(vel[out, 0])
+        out = y < 0
+        y[out] = -y[out]
+        vel[out, 1] = np.abs(vel[out, 1])
+
+        # Paddle: falling balls that overlap it are put back on top
+        on = ((vel[:, 1] > 0) & (x + size > paddle.left) & (x < paddle.right)
+              & (y + size > paddle.top) & (y < paddle.bottom))
+        y[on] = paddle.top - size
+        vel[on, 1] = -vel[on, 1]
+
+        # Bricks: look up the cells under nine points of every ball
+        rows, cols = self.cells.shape
+        xs = x[:, None] + self._offsets - self.x0
+        ys = y[:, None] + self._offsets - self.y0
+        c = np.floor_divide(xs, self.step_x).astype(np.int32)
+        r = np.floor_divide(ys, self.step_y).astype(np.int32)
+        in_x = (xs - c * self.step_x < self.w) & (c >= 0) & (c < cols)
+        in_y = (ys - r * self.step_y < self.h) & (r >= 0) & (r < rows)
+        ids = self.cells[np.clip(r, 0, rows - 1)[:, :, None], np.clip(c, 0, cols - 1)[:, None, :]]
+        ids = np.where(in_y[:, :, None] & in_x[:, None, :], ids, -1).reshape(n, 9)
+        hit = ids >= 0
+        balls = np.nonzero(hit.any(axis=1))[0]
+        hit_ids = ids[balls, hit[balls].argmax(axis=1)]
+        if len(balls):
+            # Reflect on the axis the ball came in on (both at a corner)
+            bx = self.x0 + self.col[hit_ids] * self.step_x
+            by = self.y0 + self.row[hit_ids] * self.step_y
+            px, py = prev[balls, 0], prev[balls, 1]
+            was_over = (px < bx + self.w) & (px + size > bx)
+            was_beside = (py < by + self.h) & (py + size > by)
+            flip_x = balls[~was_over]
+            flip_y = balls[was_over | ~was_beside]
+            vel[flip_x, 0] = -vel[flip_x, 0]
+            vel[flip_y, 1] = -vel[flip_y, 1]
+            pos[balls] = prev[balls]
+
+        # Drop the balls that fell out
+        keep = y <= self.height
+        if not keep.all():
+            kept = np.nonzero(keep)[0]
+            m = len(kept)
+            self.pos[:m], self.prev[:m], self.vel[:m] = pos[kept], prev[kept], vel[kept]
+            self.count = m
+        return hit_ids
+
+    def draw(self, surface, alpha=1.0):
+        """Blit every ball, between its last two positions. Returns the rects."""
+        n = self.count
+        xy = np.rint(self.prev[:n] + (self.pos[:n] - self.prev[:n]) * alpha).astype(int)
+        image = self.image
+        self.drawn = surface.blits([(image, p) for p in xy.tolist()])
+        return self.drawn
+
+    def erase(self, sprites):
+        """Have a LayeredDirty group repaint where the balls were last drawn."""
+        for rect in self.drawn:
+            sprites.repaint_rect(rect)
+        self.drawn = []
@@ -0,0 +1,115 @@
+import numpy as np
+import pygame
+
+# Particles alive at once; bursts beyond this are cut short
+CAPACITY = 16384
+
+BURST = 40           # particles per burst
+SPEED = 3.0          # fastest initial speed, pixels per tick
+GRAVITY = 0.15       # added to the y velocity every tick
+LIFETIME = (20, 50)  # ticks, drawn at random per particle
+SHRINK_AT = 12       # ticks left when a particle shrinks from 2x2 to one pixel
+
+
+class ParticleSystem:
+    """A fixed pool of particles kept as NumPy arrays, one entry per particle.
+
+    Position, velocity, ticks left and color are separate arrays with the
+    live particles packed at the front, so update() is a handful of array
+    operations however many there are, and draw() writes them all into
+    the surface's pixels in one go (surfarray). Nothing is allocated per
+    particle.
+
+    Particles are decoration: they have their own random generator and
+    never touch the game's, so they do not change how a replay plays.
+    Positions are in whatever coordinates the game uses; draw() takes the
+    offset to the screen.
+    """
+
+    def __init__(self, surface, capacity=CAPACITY, seed=None):
+        self.surface = surface
+        self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+        self.count = 0
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.int16)
+        self.color = np.zeros(capacity, dtype=np.uint32)  # mapped to the surface's format
+        self.drawn = None  # rect covering the last draw()
+
+    def burst(self, rect, color, count=BURST):
+        """Throw count particles of color out of rect, mostly upwards."""
+        n = self.count
+        count = min(count, self.capacity - n)
+        if count <= 0:
+            return
+        rng = self.rng
+        end = n + count
+        self.x[n:end] = rng.uniform(rect.left, rect.right, count)
+        self.y[n:end] = rng.uniform(rect.top, rect.bottom, count)
+        angle = rng.uniform(0, 2 * np.pi, count)
+        speed = rng.uniform(0.3, 1.0, count) * SPEED
+        self.vx[n:end] = np.cos(angle) * speed
+        self.vy[n:end] = np.sin(angle) * speed - 1.0
+        self.life[n:end] = rng.integers(*LIFETIME, count)
+        self.color[n:end] = self.surface.map_rgb(color)
+        self.count = end
+
+    def update(self):
+        """Advance every particle one tick and drop the expired ones."""
+        n = self.count
+        if not n:
+            return
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.vy[:n] += GRAVITY
+        life = self.life[:n]
+        life -= 1
+        if life.min() <= 0:
+            kept = np.nonzero(life > 0)[0]
+            m = len(kept)
+            for values in (self.x, self.y, self.vx, self.vy, self.life, self.color):
+                values[:m] = values[:n][kept]
+            self.count = m
+
+    def draw(self, offset=(0, 0)):
+        """Write the particles into the surface. Returns the rect they cover, or None.
+
+        offset is subtracted from positions, e.g. (0, camera_y).
+        """
+        n = self.count
+        self.drawn = None
+        if not n:
+            return None
+        w, h = self.surface.get_size()
+        xs = self.x[:n].astype(np.intp) - int(offset[0])
+        ys = self.y[:n].astype(np.intp) - int(offset[1])
+        on = (xs >= 0) & (xs < w - 1) & (ys >= 0) & (ys < h - 1)
+        xs, ys = xs[on], ys[on]
+        if not len(xs):
+            return None
+        colors = self.color[:n][on]
+        big = self.life[:n][on] > SHRINK_AT
+
+        pixels = pygame.surfarray.pixels2d(self.surface)  # locks the surface
+        pixels[xs, ys] = colors
+        xb, yb, cb = xs[big], ys[big], colors[big]
+        pixels[xb + 1, yb] = cb
+        pixels[xb, yb + 1] = cb
+        pixels[xb + 1, yb + 1] = cb
+        del pixels
+
+        left, top = int(xs.min()), int(ys.min())
+        self.drawn = pygame.Rect(left, top, int(xs.max()) - left + 2, int(ys.max()) - top + 2)
+        return self.drawn
+
+    def erase(self, sprites):
+        """Have a LayeredDirty group repaint where the particles were last drawn."""
+        if self.drawn is not None:
+            sprites.repaint_rect(self.drawn)
+            self.drawn = None
+
+    def clear(self):
+        self.count = 0
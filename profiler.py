@@ -0,0 +1,172 @@
+import collections
+import json
+import os
+import time
+
+import pygame
+
+from utils import get_font
+
+# Write every frame's phase timings out: ARCADE_PROFILE=frames.csv (CSV), other names JSON lines
+PROFILE_PATH = os.environ.get("ARCADE_PROFILE")
+
+# Key that shows/hides the overlay
+OVERLAY_KEY = pygame.K_F3
+
+# Frames averaged by the overlay, and how often its text is re-rendered
+WINDOW = 120
+OVERLAY_REFRESH = 15
+
+OVERLAY_BG = (0, 0, 0)
+OVERLAY_FG = (255, 255, 255)
+OVERLAY_WARN = (255, 90, 90)
+
+
+class FrameProfiler:
+    """Times each phase of a frame: start(), lap(phase) after every phase, end().
+
+    attach() adds an overlay of the last WINDOW frames to a Renderer, shown on F3.
+    """
+
+    def __init__(self, game, fps, path=PROFILE_PATH):
+        self.game = game
+        self.fps = fps
+        self.budget_ns = 1_000_000_000 // fps
+        self.frame = 0
+        self.overlay = False
+        self.clock = None  # pygame Clock, for the FPS shown in the overlay
+
+        self._phases = {}  # phase -> ns this frame
+        self._history = collections.defaultdict(lambda: collections.deque(maxlen=WINDOW))
+        self._totals = collections.deque(maxlen=WINDOW)
+        self._start = self._last = 0
+
+        self._renderer = None
+        self._surface = None
+
+        self._file = None
+        if path:
+            # Line buffered: each frame reaches the file even if the game is killed
+            self._file = open(path, "a", buffering=1)
+            self._csv = path.endswith(".csv")
+            if self._csv and self._file.tell() == 0:
+                self._file.write("game,frame,phase,ns\n")
+
+    # ---------------- TIMING ----------------
+    def start(self):
+        self._start = self._last = time.perf_counter_ns()
+
+    def lap(self, phase):
+        now = time.perf_counter_ns()
+        self._phases[phase] = self._phases.get(phase, 0) + now - self._last
+        self._last = now
+
+    def slack_ns(self):
+        """Time left in the frame's budget, negative once it is over."""
+        return self.budget_ns - (time.perf_counter_ns() - self._start)
+
+    def end(self):
+        total = self._last - self._start
+        self.frame += 1
+        for phase, ns in self._phases.items():
+            self._history[phase].append(ns)
+        self._totals.append(total)
+        if self._file is not None:
+            self._write(total)
+        self._phases = {}
+
+    def _write(self, total):
+        # One write per frame, so line buffering flushes once per frame
+        if self._csv:
+            prefix = f"{self.game},{self.frame},"
+            rows = [f"{prefix}{phase},{ns}\n" for phase, ns in self._phases.items()]
+            rows.append(f"{prefix}total,{total}\n")
+            self._file.write("".join(rows))
+        else:
+            record = {"game": self.game, "frame": self.frame}
+            record.update(self._phases)
+            record["total"] = total
+            self._file.write(json.dumps(record) + "\n")
+
+    def close(self):
+        if self._renderer is not None:
+            self._renderer.overlays.remove(self._draw_overlay)
+            self._renderer = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def summary(self):
+        """phase -> (mean ms, max ms) over the last WINDOW frames."""
+        result = {}
+        for phase, samples in self._history.items():
+            if samples:
+                result[phase] = (sum(samples) / len(samples) / 1e6, max(samples) / 1e6)
+        return result
+
+    # ---------------- OVERLAY ----------------
+    def attach(self, renderer, clock=None):
+        """Draw the overlay (while shown) on every frame the renderer presents."""
+        self._renderer = renderer
+        self.clock = clock
+        renderer.overlays.append(self._draw_overlay)
+
+    def handle_event(self, event):
+        """Toggle the overlay on F3. Returns True if the event was used."""
+        if event.type != pygame.KEYDOWN or event.key != OVERLAY_KEY:
+            return False
+        self.overlay = not self.overlay
+        self._surface = None
+        if not self.overlay and self._renderer is not None:
+            self._renderer.invalidate()  # repaint what the overlay covered
+        return True
+
+    def _draw_overlay(self, screen):
+        if not self.overlay:
+            return None
+        if self._surface is None or self.frame % OVERLAY_REFRESH == 0:
+            self._surface = self._render_overlay()
+        # Bottom right, clear of the score and lives HUDs
+        return screen.blit(self._surface, self._surface.get_rect(
+            bottomright=(screen.get_width() - 6, screen.get_height() - 6)))
+
+    def _render_overlay(self):
+        font = get_font("consolas", 14)
+        budget = self.budget_ns / 1e6
+        frame = sum(self._totals) / len(self._totals) / 1e6 if self._totals else 0.0
+        fps = self.clock.get_fps() if self.clock is not None else 0.0
+
+        lines = [(f"{fps:5.1f} fps  budget {budget:.1f} ms", OVERLAY_FG),
+                 (f"frame {frame:6.2f} ms avg", OVERLAY_WARN if frame > budget else OVERLAY_FG)]
+        for phase, (mean, worst) in self.summary().items():
+            color = OVERLAY_WARN if worst > budget else OVERLAY_FG
+            lines.append((f"{phase:<10}{mean:6.2f} {worst:6.2f}", color))
+
+        # Rendered directly: these strings change too often to be worth caching
+        texts = [font.render(text, True, color) for text, color in lines]
+        width = max(t.get_width() for t in texts) + 12
+        height = sum(t.get_height() for t in texts) + 12
+        # Opaque, so redrawing it over itself in dirty mode leaves no trails
+        surface = pygame.Surface((width, height))
+        surface.fill(OVERLAY_BG)
+        y = 6
+        for text in texts:
+            surface.blit(text, (6, y))
+            y += text.get_height()
+        return surface
+
+
+class NullProfiler:
+    """Stands in for a FrameProfiler when nothing is being measured."""
+
+    def start(self):
+        pass
+
+    def lap(self, phase):
+        pass
+
+    def end(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
@@ -1,58 +1,20 @@
 import pygame
-import sys
 import random
-import os
-
-# Load high scores from file
-def load_high_scores():
-    if not os.path.exists("highscores.txt"):
-        return []
-    scores = []
-    with open("highscores.txt", "r") as f:
-        for line in f:
-            parts = line.strip().split()
-            if len(parts) == 2 and parts[1].isdigit():
-                initials, score = parts
-                scores.append((initials, int(score)))
-    return scores
-
-# Save high scores to file
-def save_high_scores(scores):
-    with open("highscores.txt", "w") as f:
-        for initials, score in scores[:5]:
-            f.write(f"{initials} {score}\n")
-
-# Prompt for initials (arcade style)
-def get_initials(screen, font):
-    initials = ""
-    big_font = pygame.font.SysFont("arial", 48)
-
-    while True:
-        screen.fill(BLACK)
-        prompt = font.render("Enter your initials (3 letters):", True, WHITE)
-        current = big_font.render(initials, True, WHITE)
-
-        screen.blit(prompt, (WIDTH//2 - prompt.get_width()//2, HEIGHT//2 - 60))
-        screen.blit(current, (WIDTH//2 - current.get_width()//2, HEIGHT//2))
-        pygame.display.flip()
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_RETURN and len(initials) == 3:
-                    return initials
-                elif event.key == pygame.K_BACKSPACE and len(initials) > 0:
-                    initials = initials[:-1]
-                elif len(initials) < 3 and event.unicode.isalpha():
-                    initials += event.unicode.upper()
+from collections import deque
 
+from leaderboard import get_leaderboard
+import assets
+import replay
+from scenes import GameOver, PlayScene
+from utils import get_font, render_text
 
 # Game constants
 WIDTH, HEIGHT = 600, 400
 TILE_SIZE = 20
-FPS = 10
+FPS = 10  # simulation ticks per second (drawing runs at utils.RENDER_FPS)
+
+# Bump when a change to the rules would make old replays play out differently
+RULES_VERSION = 0
 
 # Colors
 BLACK = (0, 0, 0)
@@ -61,147 +23,248 @@ RED = (200, 0, 0)
 WHITE = (255, 255, 255)
 
 
-def run_game(screen):
-    clock = pygame.time.Clock()
-    font = pygame.font.SysFont("arial", 24)
-
-    #high score setup
-    high_scores = load_high_scores()
-
-    # Snake setup
-    snake = [(100, 100), (80, 100), (60, 100)]
-    direction = (TILE_SIZE, 0)  # moving right
-
-    # Food setup
-    food = (WIDTH // 2, HEIGHT // 2)
-
-    # Score
-    score = 0
-
-    while True:
-        #reset game 
-        clock = pygame.time.Clock()
-        font = pygame.font.SysFont("arial", 24)
-
-        snake = [(100, 100), (80,100), (60, 100)]
-        direction = (TILE_SIZE, 0)
-        food = (WIDTH // 2, HEIGHT // 2)
-        score = 0
-        running = True
-
-        while running:
-            # Event handling
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_UP and direction != (0, TILE_SIZE):
-                        direction = (0, -TILE_SIZE)
-                    elif event.key == pygame.K_DOWN and direction != (0, -TILE_SIZE):
-                        direction = (0, TILE_SIZE)
-                    elif event.key == pygame.K_LEFT and direction != (TILE_SIZE, 0):
-                        direction = (-TILE_SIZE, 0)
-                    elif event.key == pygame.K_RIGHT and direction != (-TILE_SIZE, 0):
-                        direction = (TILE_SIZE, 0)
-
-            # Move snake
-            new_head = (snake[0][0] + direction[0], snake[0][1] + direction[1])
-            snake.insert(0, new_head)
-
-            # Check collisions
-            if (
-                new_head[0] < 0 or new_head[0] >= WIDTH or
-                new_head[1] < 0 or new_head[1] >= HEIGHT or
-                new_head in snake[1:]
-            ):
-                running = False  # game over
-
-            # Check food
-            if new_head == food:
-                score += 1
-                food = (
-                    random.randrange(0, WIDTH, TILE_SIZE),
-                    random.randrange(0, HEIGHT, TILE_SIZE)
-                )
-            else:
-                snake.pop()  # remove tail
-
-            # Drawing
-            screen.fill(BLACK)
-            for segment in snake:
-                pygame.draw.rect(screen, GREEN, (segment[0], segment[1], TILE_SIZE, TILE_SIZE))
-            pygame.draw.rect(screen, RED, (food[0], food[1], TILE_SIZE, TILE_SIZE))
-        
-            # Draw score
-            score_text = font.render(f"Score: {score}", True, WHITE)
-            screen.blit(score_text, (10, 10))
-            pygame.display.flip()
-
-            clock.tick(FPS)
-
-        # ---------------- GAME OVER SCREEN ----------------
+# Directions in grid cells per tick
+UP, DOWN, LEFT, RIGHT = (0, -1), (0, 1), (-1, 0), (1, 0)
+
+KEY_DIRECTIONS = {
+    pygame.K_UP: UP,
+    pygame.K_DOWN: DOWN,
+    pygame.K_LEFT: LEFT,
+    pygame.K_RIGHT: RIGHT,
+}
+
+# Smallest board a game can start on: the snake plus a cell in front of it
+MIN_COLS, MIN_ROWS = 4, 1
+
+
+def start_cells(cols, rows):
+    """The starting snake, head first, heading right from (5, 5) or as far in as fits."""
+    if cols < MIN_COLS or rows < MIN_ROWS:
+        raise ValueError(f"a {cols}x{rows} board is too small for Snake "
+                         f"(at least {MIN_COLS}x{MIN_ROWS})")
+    x, y = min(5, cols - 2), min(5, rows // 2)
+    return [(x, y), (x - 1, y), (x - 2, y)]
+
+
+class SnakeGame:
+    """Snake rules on a grid of cells, with no drawing or input handling.
+
+    Free cells are kept in a swap-remove list, so every tick is O(1).
+    """
+
+    def __init__(self, cols=WIDTH // TILE_SIZE, rows=HEIGHT // TILE_SIZE, seed=None):
+        self.start = start_cells(cols, rows)
+        self.cols = cols
+        self.rows = rows
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.snake = deque(self.start)
+        self.direction = RIGHT
+        self.score = 0
+        self.ticks = 0
+        self.alive = True
+        self.vacated = None  # tail cell freed by the last step, for redraws
+
+        # _free lists every empty cell index, _slot maps a cell index to its
+        # position in _free (-1 while the snake covers it)
+        cells = self.cols * self.rows
+        self._free = list(range(cells))
+        self._slot = list(range(cells))
+        for segment in self.snake:
+            self._take(segment)
+        # First food in the middle, unless the snake starts there
+        self.food = (self.cols // 2, self.rows // 2)
+        if not self.is_free(self.food):
+            self.food = self._spawn_food()
+
+    def is_free(self, cell):
+        return self._slot[cell[1] * self.cols + cell[0]] >= 0
+
+    def _take(self, cell):
+        index = cell[1] * self.cols + cell[0]
+        slot = self._slot[index]
+        last = self._free.pop()
+        if last != index:
+            self._free[slot] = last
+            self._slot[last] = slot
+        self._slot[index] = -1
+
+    def _release(self, cell):
+        index = cell[1] * self.cols + cell[0]
+        self._slot[index] = len(self._free)
+        self._free.append(index)
+
+    def _spawn_food(self):
+        if not self._free:
+            return None  # board is full
+        index = self._free[self.rng.randrange(len(self._free))]
+        return (index % self.cols, index // self.cols)
+
+    def step(self, action=None):
+        """Advance one tick towards action (None keeps going). Returns True while alive."""
+        self.vacated = None
+        if not self.alive:
+            return False
+        if action is not None and action != (-self.direction[0], -self.direction[1]):
+            self.direction = action
+
+        self.ticks += 1
+        head = (self.snake[0][0] + self.direction[0], self.snake[0][1] + self.direction[1])
+
+        # Check collisions (the tail still counts, it only moves after the head)
+        if (
+            head[0] < 0 or head[0] >= self.cols or
+            head[1] < 0 or head[1] >= self.rows or
+            not self.is_free(head)
+        ):
+            self.alive = False
+            return False
+
+        self.snake.appendleft(head)
+        self._take(head)
+
+        # Check food
+        if head == self.food:
+            self.score += 1
+            self.food = self._spawn_food()
+            if self.food is None:
+                self.alive = False  # nowhere left to grow
+                return False
+        else:
+            self.vacated = self.snake.pop()  # remove tail
+            self._release(self.vacated)
+        return True
+
+
+def cell_rect(cell):
+    return pygame.Rect(cell[0] * TILE_SIZE, cell[1] * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+
+
+def draw_game(renderer, game, font):
+    screen = renderer.screen
+    if renderer.full_redraw:
         screen.fill(BLACK)
-        big_font = pygame.font.SysFont("arial", 36)
-        msg = big_font.render("Game Over!", True, WHITE)
-        final_score = font.render(f"Final Score: {score}", True, WHITE)
-        screen.blit(msg, (WIDTH // 2 - msg.get_width() // 2, 60))
-        screen.blit(final_score, (WIDTH // 2 - final_score.get_width() // 2, 110))
-        pygame.display.flip()
-        pygame.time.wait(1000)
-
-        # Check if player made top 5
-        high_scores.append(("YOU", score))  # placeholder initials
-        high_scores = sorted(high_scores, key=lambda x: x[1], reverse=True)[:5]
-        
-        if any(init == "YOU" and sc == score for init, sc in high_scores):
-            rank = [s for s in high_scores].index(("YOU", score)) + 1
-
-            if rank == 1:
-                congrats = big_font.render("YOU'RE NUMBER 1!", True, RED)
-                screen.blit(congrats, (WIDTH // 2 - congrats.get_width() // 2, 160))
-                pygame.display.flip()
-                pygame.time.wait(1500)
-
-            initials = get_initials(screen, font)
-            # Replace placeholder initials
-            for i, (init, sc) in enumerate(high_scores):
-                if sc == score and init == "YOU":
-                    high_scores[i] = (initials, score)
-                    break
-            save_high_scores(high_scores)
-
-        # ---------------- SHOW LEADERBOARD ----------------
-        screen.fill(BLACK)
-        leader_title = big_font.render("TOP 5 SCORES", True, WHITE)
-        screen.blit(leader_title, (WIDTH // 2 - leader_title.get_width() // 2, 40))
-
-        y_offset = 100
-        for i, (init, sc) in enumerate(high_scores, start=1):
-            hs_text = font.render(f"{i}. {init}  {sc}", True, WHITE)
-            screen.blit(hs_text, (WIDTH // 2 - hs_text.get_width() // 2, y_offset))
-            y_offset += 40
-
-        retry_msg = font.render("Press Enter to Play Again", True, WHITE)
-        quit_msg = font.render("Press Esc to Return to Menu", True, WHITE)
-        screen.blit(retry_msg, (WIDTH // 2 - retry_msg.get_width() // 2, y_offset + 20))
-        screen.blit(quit_msg, (WIDTH // 2 - quit_msg.get_width() // 2, y_offset + 60))
-        pygame.display.flip()
-
-        # ---------------- WAIT FOR INPUT ----------------
-        waiting = True
-        while waiting:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_RETURN:  # restart
-                        waiting = False
-                    elif event.key == pygame.K_ESCAPE:  # back to menu
-                        return
-            clock.tick(15)  # prevent freeze
-
-
-
-
+        for segment in game.snake:
+            pygame.draw.rect(screen, GREEN, cell_rect(segment))
+    else:
+        # Between ticks only the head and the vacated tail cell change
+        if game.vacated is not None:
+            pygame.draw.rect(screen, BLACK, cell_rect(game.vacated))
+            renderer.mark(cell_rect(game.vacated))
+        pygame.draw.rect(screen, GREEN, cell_rect(game.snake[0]))
+        renderer.mark(cell_rect(game.snake[0]))
+
+    if game.food is not None:
+        pygame.draw.rect(screen, RED, cell_rect(game.food))
+        renderer.mark(cell_rect(game.food))
+
+    # Draw score
+    score_text = render_text(font, f"Score: {game.score}", WHITE)
+    hud = score_text.get_rect(topleft=(10, 10))
+    if not renderer.full_redraw:
+        # Repaint the cells under the text so old digits do not pile up
+        pygame.draw.rect(screen, BLACK, hud)
+        for x in range(hud.left // TILE_SIZE, (hud.right - 1) // TILE_SIZE + 1):
+            for y in range(hud.top // TILE_SIZE, (hud.bottom - 1) // TILE_SIZE + 1):
+                if (x, y) == game.food:
+                    pygame.draw.rect(screen, RED, cell_rect((x, y)).clip(hud))
+                elif not game.is_free((x, y)):
+                    pygame.draw.rect(screen, GREEN, cell_rect((x, y)).clip(hud))
+        renderer.mark(hud)
+    screen.blit(score_text, hud)
+
+
+def preload_assets():
+    """Snake draws rects, so only its fonts are loaded ahead (see assets.py)."""
+    for size in (24, 36, 48):
+        get_font("arial", size)
+
+
+assets.register(__name__, preload_assets)
+
+
+class GameScene(PlayScene):
+    """Snake, from the first tick to the leaderboard and round again."""
+
+    name = "python"
+    title = "Python"
+    tick_rate = FPS
+
+    def __init__(self):
+        self.font = get_font("arial", 24)
+        self.board = get_leaderboard()
+        self.board.preload("python")
+        self.game = SnakeGame()
+        self.bits = {UP: replay.UP, DOWN: replay.DOWN, LEFT: replay.LEFT, RIGHT: replay.RIGHT}
+
+    def start(self):
+        super().start()
+        self.new_game()
+
+    def new_game(self):
+        """Reset the game with a fresh seed for its replay."""
+        self.game.reset(replay.new_seed())
+        self.recording = replay.Replay("python", self.game.seed, rules=RULES_VERSION)
+        self.renderer.invalidate()
+        self.loop.reset()
+        self.started = pygame.time.get_ticks()
+        self.action = None  # last direction pressed, until a tick uses it
+        self.ticks = 0
+
+    def handle_events(self, events):
+        self.profiler.start()
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                self.action = KEY_DIRECTIONS.get(event.key, self.action)
+            self.profiler.handle_event(event)
+        self.profiler.lap("events")
+
+    def update(self):
+        game = self.game
+        self.ticks = self.loop.due()
+        for _ in range(self.ticks):
+            self.recording.record(self.bits.get(self.action, 0))
+            game.step(self.action)
+            self.action = None
+            if not game.alive:
+                break
+        self.profiler.lap("update")
+
+    def draw(self):
+        renderer, profiler = self.renderer, self.profiler
+        # Frames between ticks have nothing new to draw, unless all of it is due
+        if self.ticks or renderer.full_redraw:
+            if self.ticks > 1:
+                renderer.invalidate()  # the dirty path only knows the last tick
+            draw_game(renderer, self.game, self.font)
+        profiler.lap("draw")
+        renderer.present()
+        profiler.lap("present")
+        profiler.end()
+        if not self.game.alive:
+            self.game_over()
+
+    def game_over(self):
+        score = self.game.score
+        self.board.save_replay("python", score, self.recording.to_bytes(score))
+        self.board.record_session("python", score, (pygame.time.get_ticks() - self.started) / 1000)
+        big_font = get_font("arial", 36)
+
+        def show_result(screen):
+            screen.fill(BLACK)
+            msg = render_text(big_font, "Game Over!", WHITE)
+            final_score = render_text(self.font, f"Final Score: {score}", WHITE)
+            screen.blit(msg, (WIDTH // 2 - msg.get_width() // 2, 60))
+            screen.blit(final_score, (WIDTH // 2 - final_score.get_width() // 2, 110))
+
+        self.manager.push(GameOver(self.board, "python", score, show_result, self.font, big_font,
+                                   congrats=("YOU'RE NUMBER 1!", RED, 160)))
+
+    def resume(self, again=False):
+        if again:
+            self.new_game()
+        else:
+            self.manager.pop()  # back to the menu
@@ -0,0 +1,112 @@
+import os
+import pygame
+
+from utils import render_text
+
+# Dirty-rectangle rendering is opt-in: ARCADE_DIRTY_RECTS=1 python3 main.py
+DIRTY_RECTS = os.environ.get("ARCADE_DIRTY_RECTS") == "1"
+
+
+class Renderer:
+    """Pushes frames to the display, either whole or as dirty rectangles.
+
+    A frame is drawn in three steps:
+
+    1. draw() clears and redraws the sprite layer (self.sprites, a
+       LayeredDirty group) and remembers which rects changed.
+    2. The game draws anything else straight onto the screen and reports
+       the areas it touched with mark(). full_redraw tells it whether the
+       whole screen has to be drawn or only what changed.
+    3. present() pushes the frame: a full flip, or display.update() with
+       only the changed rects in dirty mode.
+
+    Callables in self.overlays are drawn on top of every frame just before
+    it is pushed; each returns the rect it drew (or None).
+
+    The pixels pushed per frame are counted so both modes can be compared.
+    """
+
+    def __init__(self, screen, background, dirty=None):
+        self.screen = screen
+        self.dirty = DIRTY_RECTS if dirty is None else dirty
+        self.background = pygame.Surface(screen.get_size())
+        self.background.fill(background)
+        self.sprites = pygame.sprite.LayeredDirty()
+        self.sprites.clear(screen, self.background)
+        self.overlays = []
+
+        self._rects = []
+        self._full = True
+
+        self.frames = 0
+        self.pixels_pushed = 0  # last frame
+        self.total_pixels = 0
+
+    @property
+    def full_redraw(self):
+        """True when this frame has to be drawn and pushed in full."""
+        return self._full or not self.dirty
+
+    def invalidate(self):
+        """Redraw everything next frame (after another screen was shown)."""
+        self._full = True
+
+    def mark(self, *rects):
+        self._rects.extend(pygame.Rect(r) for r in rects)
+
+    def draw(self):
+        if self.full_redraw:
+            self.sprites.repaint_rect(self.screen.get_rect())
+        self._rects.extend(self.sprites.draw(self.screen))
+
+    def present(self):
+        for overlay in self.overlays:
+            rect = overlay(self.screen)
+            if rect is not None:
+                self._rects.append(rect)
+
+        screen_rect = self.screen.get_rect()
+        if self.full_redraw:
+            pygame.display.flip()
+            pushed = screen_rect.width * screen_rect.height
+            self._full = False
+        else:
+            rects = [r.clip(screen_rect) for r in self._rects]
+            pygame.display.update(rects)
+            pushed = sum(r.width * r.height for r in rects)
+        self._rects = []
+
+        self.frames += 1
+        self.pixels_pushed = pushed
+        self.total_pixels += pushed
+
+    def report(self):
+        """One-line summary of pixels pushed per frame."""
+        full = self.screen.get_width() * self.screen.get_height()
+        average = self.total_pixels / self.frames if self.frames else 0
+        mode = "dirty" if self.dirty else "full"
+        return (f"[{mode}] {self.frames} frames, {average:.0f} px/frame pushed "
+                f"({100 * average / full:.1f}% of a full frame)")
+
+
+class TextSprite(pygame.sprite.DirtySprite):
+    """HUD text that is only re-rendered and redrawn when it changes.
+
+    anchor is passed to get_rect(), e.g. topleft=(10, 10).
+    """
+
+    def __init__(self, font, color, **anchor):
+        super().__init__()
+        self.font = font
+        self.color = color
+        self.anchor = anchor
+        self.text = None
+        self.set_text("")
+
+    def set_text(self, text):
+        if text == self.text:
+            return
+        self.text = text
+        self.image = render_text(self.font, text, self.color)
+        self.rect = self.image.get_rect(**self.anchor)
+        self.dirty = 1
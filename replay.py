@@ -0,0 +1,238 @@
+"""Deterministic input replays.
+
+Every game draws its randomness from one seeded random.Random and reads
+its input once per tick, so a session is fully described by its seed and
+the keys held on each tick. A Replay stores exactly that, compactly, and
+play() re-runs it headless at full speed.
+
+    python3 replay.py verify            # re-run every stored replay
+    python3 replay.py verify FILE ...   # re-run exported replay files
+    python3 replay.py export ID FILE    # write a stored replay to a file
+"""
+import importlib
+import os
+import random
+import struct
+import sys
+import time
+
+# Input bits recorded for each tick
+LEFT, RIGHT, UP, DOWN, ACTION = 1, 2, 4, 8, 16
+
+MAGIC = b"ARCR"
+VERSION = 2
+# version, seed, variant (e.g. level index), ticks, final score
+_HEADER = struct.Struct("<BQHIi")
+# Version 2 adds the game's RULES_VERSION after the header
+_RULES = struct.Struct("<H")
+
+
+def new_seed():
+    """A fresh seed for one session."""
+    return random.getrandbits(63)
+
+
+def input_bits(left=False, right=False, up=False, down=False, action=False):
+    return ((LEFT if left else 0) | (RIGHT if right else 0) | (UP if up else 0)
+            | (DOWN if down else 0) | (ACTION if action else 0))
+
+
+def _write_varint(out, n):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(data, pos):
+    n = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+
+class Replay:
+    """Seed plus per-tick input bits of one session.
+
+    Inputs are kept run-length encoded: holding a key (or nothing) for a
+    hundred ticks is one (bits, 100) pair, two or three bytes on disk.
+    """
+
+    def __init__(self, game, seed, variant=0, rules=0):
+        self.game = game
+        self.seed = seed
+        self.variant = variant
+        self.rules = rules
+        self.ticks = 0
+        self.score = None
+        self.runs = []  # [bits, count]
+
+    def record(self, bits):
+        self.ticks += 1
+        if self.runs and self.runs[-1][0] == bits:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([bits, 1])
+
+    def inputs(self):
+        """The recorded bits, one per tick."""
+        for bits, count in self.runs:
+            for _ in range(count):
+                yield bits
+
+    def to_bytes(self, score):
+        self.score = score
+        name = self.game.encode()
+        out = bytearray(MAGIC)
+        out += _HEADER.pack(VERSION, self.seed, self.variant, self.ticks, score)
+        out += _RULES.pack(self.rules)
+        out.append(len(name))
+        out += name
+        for bits, count in self.runs:
+            out.append(bits)
+            _write_varint(out, count)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:4] != MAGIC:
+            raise ValueError("not a replay")
+        version, seed, variant, ticks, score = _HEADER.unpack_from(data, 4)
+        if version > VERSION:
+            raise ValueError(f"unsupported replay version {version}")
+        pos = 4 + _HEADER.size
+        rules = 0
+        if version >= 2:
+            (rules,) = _RULES.unpack_from(data, pos)
+            pos += _RULES.size
+        name_len = data[pos]
+        pos += 1
+        replay = cls(data[pos:pos + name_len].decode(), seed, variant, rules)
+        pos += name_len
+        while pos < len(data):
+            bits = data[pos]
+            count, pos = _read_varint(data, pos + 1)
+            replay.runs.append([bits, count])
+        replay.ticks = ticks
+        replay.score = score
+        return replay
+
+    def save(self, path, score=None):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes(self.score if score is None else score))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+# ---------------- HEADLESS PLAYBACK ----------------
+def _play_python(replay):
+    from python_game import SnakeGame, UP as N, DOWN as S, LEFT as W, RIGHT as E
+    directions = {UP: N, DOWN: S, LEFT: W, RIGHT: E}
+    game = SnakeGame(seed=replay.seed)
+    for bits in replay.inputs():
+        game.step(directions.get(bits))
+    return game
+
+
+def _play_jumper(replay):
+    from jumper import DIFFICULTY_CURVES, JumperGame
+    height, curve = divmod(replay.variant, 256)  # see jumper.replay_variant
+    game = JumperGame(replay.seed, curve=list(DIFFICULTY_CURVES)[curve], height=height)
+    for bits in replay.inputs():
+        game.step(bits & LEFT, bits & RIGHT)
+    return game
+
+
+def _play_brickbreaker(replay):
+    from brickbreaker import BrickBreakerGame
+    game = BrickBreakerGame(replay.variant, replay.seed)
+    for bits in replay.inputs():
+        game.step(bits & LEFT, bits & RIGHT, bits & ACTION)
+    return game
+
+
+# game -> (module, playback function)
+PLAYERS = {
+    "python": ("python_game", _play_python),
+    "jumper": ("jumper", _play_jumper),
+    "brickbreaker": ("brickbreaker", _play_brickbreaker),
+}
+
+
+def is_current(replay):
+    """False if the game's rules changed since the replay was recorded."""
+    module = importlib.import_module(PLAYERS[replay.game][0])
+    return replay.rules == module.RULES_VERSION
+
+
+def play(replay):
+    """Re-run a replay without a window. Returns the game in its final state."""
+    return PLAYERS[replay.game][1](replay)
+
+
+def verify(replay):
+    """True if re-running the replay ends the game with the recorded score."""
+    game = play(replay)
+    return not game.alive and game.score == replay.score
+
+
+# ---------------- COMMAND LINE ----------------
+def _stored(board, game=None):
+    for replay_id, data in board.replays(game):
+        yield f"#{replay_id}", Replay.from_bytes(data)
+
+
+def _verify_all(items):
+    checked = failed = stale = ticks = 0
+    start = time.perf_counter()
+    for label, replay in items:
+        if not is_current(replay):
+            stale += 1  # recorded under older rules, cannot match
+            continue
+        game = play(replay)
+        checked += 1
+        ticks += replay.ticks
+        if game.alive or game.score != replay.score:
+            failed += 1
+            print(f"MISMATCH {label} {replay.game}: recorded {replay.score}, "
+                  f"replayed {game.score}{' (still alive)' if game.alive else ''}")
+    elapsed = time.perf_counter() - start
+    rate = ticks / elapsed if elapsed else 0
+    print(f"{checked} replays, {failed} mismatches, {ticks} ticks in {elapsed:.2f}s "
+          f"({rate:,.0f} ticks/s)" + (f", {stale} skipped (older rules)" if stale else ""))
+    return failed == 0
+
+
+def main(argv):
+    # Playback needs no window
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from leaderboard import get_leaderboard
+
+    if argv[:1] == ["verify"]:
+        files = argv[1:]
+        if files:
+            items = ((path, Replay.load(path)) for path in files)
+        else:
+            items = _stored(get_leaderboard())
+        return 0 if _verify_all(items) else 1
+    if argv[:1] == ["export"] and len(argv) == 3:
+        data = get_leaderboard().replay(int(argv[1]))
+        if data is None:
+            print(f"no replay #{argv[1]}")
+            return 1
+        with open(argv[2], "wb") as f:
+            f.write(data)
+        return 0
+    print(__doc__)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
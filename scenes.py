@@ -0,0 +1,288 @@
+"""Screens of the arcade as a stack of scenes run by one loop.
+
+The menu, a level select, a game and its end screens are each a Scene.
+A SceneManager keeps them on a stack and runs the only loop in the
+arcade: every frame it reads the events, hands them to the scene on
+top, updates and draws it, and sleeps on its one clock at that scene's
+fps. Opening a screen pushes it, leaving it pops it (handing a result
+to the scene below), so nothing nests or recurses: playing again resets
+the game scene that is already there instead of starting a new loop.
+
+A scene that pushes or pops while handling events or updating is not
+updated or drawn again that frame; the new top scene runs from the next.
+
+Menus and wait screens are idle scenes: instead of running frames at
+their fps, the loop sleeps until an event arrives or the scene's next
+timer (wake_in) is due, and they only draw what changed, so a cabinet
+left on the menu uses next to no CPU.
+"""
+import pygame
+
+from leaderboard import ANONYMOUS
+from profiler import FrameProfiler
+from renderer import Renderer
+from utils import FixedStep, draw_leaderboard, get_font, render_text
+
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+
+# How long an idle scene sleeps between looks at the event queue: the
+# most a key press waits before it is seen
+IDLE_POLL_MS = 30
+
+
+class Scene:
+    """One screen. Every method is optional.
+
+    start() runs when the scene is pushed, resume(result) when the scene
+    above it is popped with result, stop() when it leaves the stack.
+    While it is on top, each frame calls handle_events(events), update()
+    and draw(), and then waits for the next of fps frames per second.
+
+    An idle scene has no frame rate: after its first frame on top, a frame
+    runs when events arrive, or once wake_in() milliseconds have passed
+    (never, if it returns None).
+    """
+
+    fps = 30
+    idle = False
+    manager = None
+
+    def wake_in(self):
+        """Milliseconds until an idle scene needs a frame without events, or None."""
+        return None
+
+    def start(self):
+        pass
+
+    def resume(self, result=None):
+        pass
+
+    def stop(self):
+        pass
+
+    def handle_events(self, events):
+        for event in events:
+            self.handle_event(event)
+
+    def handle_event(self, event):
+        pass
+
+    def update(self):
+        pass
+
+    def draw(self):
+        pass
+
+
+class SceneManager:
+    """The scene stack, the window it draws on and the clock of the loop."""
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.clock = pygame.time.Clock()
+        self.stack = []
+        self._last = None  # scene that ran the last frame
+
+    @property
+    def top(self):
+        return self.stack[-1] if self.stack else None
+
+    def push(self, scene):
+        scene.manager = self
+        self.stack.append(scene)
+        scene.start()
+
+    def pop(self, result=None):
+        """Close the top scene; the one below resumes with result."""
+        scene = self.stack.pop()
+        scene.stop()
+        if self.stack:
+            self.stack[-1].resume(result)
+
+    def replace(self, scene):
+        """Swap the top scene for another, without resuming the one below."""
+        self.stack.pop().stop()
+        self.push(scene)
+
+    def quit(self):
+        """Stop every scene, top first; run() then returns."""
+        while self.stack:
+            self.stack.pop().stop()
+
+    def run(self):
+        """Run frames until the stack is empty or the window is closed."""
+        while self.stack:
+            scene = self.stack[-1]
+            if scene.idle and scene is self._last:
+                events = self.wait_events(scene)
+            else:
+                events = pygame.event.get()
+            self._last = scene
+            if any(event.type == pygame.QUIT for event in events):
+                self.quit()
+                break
+            scene.handle_events(events)
+            if self.top is scene:
+                scene.update()
+            if self.top is scene:
+                scene.draw()
+            if not scene.idle:
+                self.clock.tick(scene.fps)
+
+    def wait_events(self, scene):
+        """Sleep until there are events or the idle scene's timer is due.
+
+        pygame.event.wait(timeout) would wake up for the first event, but
+        pygame waits by checking the queue every millisecond, which costs
+        about three times the CPU of sleeping IDLE_POLL_MS between checks.
+        """
+        timeout = scene.wake_in()
+        while True:
+            events = pygame.event.get()
+            if events or (timeout is not None and timeout <= 0):
+                break
+            step = IDLE_POLL_MS if timeout is None else min(IDLE_POLL_MS, timeout)
+            pygame.time.wait(step)
+            if timeout is not None:
+                timeout -= step
+        if any(event.type == pygame.WINDOWEXPOSED for event in events):
+            pygame.display.flip()  # the window was uncovered: show the last frame again
+        return events
+
+
+# ---------------- SHARED SCENES ----------------
+class PlayScene(Scene):
+    """A game: ticks at tick_rate, drawn by a Renderer, timed by a FrameProfiler.
+
+    start() sets up self.renderer, self.loop and self.profiler; stop()
+    prints the dirty-rect report (as title) and closes the profiler.
+    """
+
+    name = None   # the game's name in profiles
+    title = None  # the game's name in reports
+    tick_rate = 60
+
+    def start(self):
+        self.renderer = Renderer(self.manager.screen, BLACK)
+        self.loop = FixedStep(self.tick_rate, clock=self.manager.clock)
+        self.fps = self.loop.render_rate
+        self.profiler = FrameProfiler(self.name, self.fps)
+        self.profiler.attach(self.renderer, self.loop.clock)
+
+    def keys(self):
+        """The keys held down, as pygame.key.get_pressed() (a bot may stand in)."""
+        return pygame.key.get_pressed()
+
+    def stop(self):
+        if self.renderer.dirty:
+            print(f"{self.title}:", self.renderer.report())
+        self.profiler.close()
+
+
+class InitialsPrompt(Scene):
+    """Ask for initials, arcade style. Pops with the 3 letters."""
+
+    idle = True
+
+    def __init__(self, font):
+        self.font = font
+        self.initials = ""
+        self.drawn = None  # initials on screen
+
+    def handle_event(self, event):
+        if event.type != pygame.KEYDOWN:
+            return
+        if event.key == pygame.K_RETURN and len(self.initials) == 3:
+            self.manager.pop(self.initials)
+        elif event.key == pygame.K_BACKSPACE and len(self.initials) > 0:
+            self.initials = self.initials[:-1]
+        elif len(self.initials) < 3 and event.unicode.isalpha():
+            self.initials += event.unicode.upper()
+
+    def draw(self):
+        if self.initials == self.drawn:
+            return
+        self.drawn = self.initials
+        screen = self.manager.screen
+        width, height = screen.get_size()
+        screen.fill(BLACK)
+        prompt = render_text(self.font, "Enter your initials (3 letters):", WHITE)
+        current = render_text(get_font("arial", 48), self.initials, WHITE)
+        screen.blit(prompt, (width//2 - prompt.get_width()//2, height//2 - 60))
+        screen.blit(current, (width//2 - current.get_width()//2, height//2))
+        pygame.display.flip()
+
+
+class GameOver(Scene):
+    """What follows a game: its result, initials for a top 5 score, then
+    the leaderboard. Pops with True on Enter (play again), False on Esc.
+
+    show_result(screen) draws the result, which stays up for a second.
+    congrats, (text, color, y), is then shown over it for a new number 1.
+    Every score is added to board_name; only top 5 ones get initials.
+    """
+
+    RESULT_MS = 1000
+    CONGRATS_MS = 1500
+    idle = True
+
+    def __init__(self, board, board_name, score, show_result, font, big_font,
+                 title="TOP 5 SCORES", congrats=None,
+                 hints=("Press Enter to Play Again", "Press Esc to Return to Menu")):
+        self.board = board
+        self.board_name = board_name
+        self.score = score
+        self.show_result = show_result
+        self.font = font
+        self.big_font = big_font
+        self.title = title
+        self.congrats = congrats
+        self.hints = hints
+        self.stage = None
+        self.until = 0  # ticks when the result or congrats screen is done
+
+    def start(self):
+        self.show_result(self.manager.screen)
+        pygame.display.flip()
+        self.stage = "result"
+        self.until = pygame.time.get_ticks() + self.RESULT_MS
+
+    def wake_in(self):
+        if self.stage in ("result", "congrats"):
+            return max(0, self.until - pygame.time.get_ticks())
+        return None
+
+    def update(self):
+        if self.stage not in ("result", "congrats") or pygame.time.get_ticks() < self.until:
+            return
+        board, name = self.board, self.board_name
+        if not board.makes_top(name, self.score, 5):
+            self._show_board(ANONYMOUS)
+        elif self.stage == "result" and self.congrats and board.rank(name, self.score) == 1:
+            text, color, y = self.congrats
+            screen = self.manager.screen
+            congrats = render_text(self.big_font, text, color)
+            screen.blit(congrats, (screen.get_width() // 2 - congrats.get_width() // 2, y))
+            pygame.display.flip()
+            self.stage = "congrats"
+            self.until += self.CONGRATS_MS
+        else:
+            self.stage = "initials"
+            self.manager.push(InitialsPrompt(self.font))
+
+    def resume(self, initials=None):
+        self._show_board(initials)
+
+    def _show_board(self, initials):
+        self.board.add(self.board_name, initials, self.score)
+        draw_leaderboard(self.manager.screen, self.title, self.board.top(self.board_name, 5),
+                         self.font, self.big_font, self.hints)
+        self.stage = "board"
+
+    def handle_event(self, event):
+        if self.stage == "board" and event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_RETURN:
+                self.manager.pop(True)
+            elif event.key == pygame.K_ESCAPE:
+                self.manager.pop(False)
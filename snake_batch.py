@@ -0,0 +1,151 @@
+import numpy as np
+
+from python_game import WIDTH, HEIGHT, TILE_SIZE, UP, DOWN, LEFT, RIGHT, start_cells
+
+# Action codes: index into ACTIONS, or NOOP to keep the current direction.
+# Opposite directions differ only in the lowest bit (UP^1 == DOWN).
+ACTIONS = (UP, DOWN, LEFT, RIGHT)
+NOOP = -1
+
+_DX = np.array([d[0] for d in ACTIONS], dtype=np.int32)
+_DY = np.array([d[1] for d in ACTIONS], dtype=np.int32)
+
+# Birth tick of a cell nobody has ever entered
+_NEVER = np.int32(-(2 ** 30))
+
+
+class BatchSnake:
+    """N independent Snake boards advanced in lockstep with NumPy.
+
+    Follows the same rules as python_game.SnakeGame (same start position,
+    the tail still counts for self-collision), but every board is a row in
+    a set of arrays, so one step() call advances all of them.
+
+    Instead of storing each body, every cell remembers the tick at which a
+    head last entered it. A cell is part of the body while
+    ``ticks - birth < length``, so moving the snake is a single write and
+    growing it is just ``length += 1``.
+    """
+
+    def __init__(self, n, cols=WIDTH // TILE_SIZE, rows=HEIGHT // TILE_SIZE,
+                 seed=None, auto_reset=True):
+        self.start = start_cells(cols, rows)
+        self.n = n
+        self.cols = cols
+        self.rows = rows
+        self.cells = cols * rows
+        self.auto_reset = auto_reset
+        self.rng = np.random.default_rng(seed)
+
+        self.birth = np.empty((n, self.cells), dtype=np.int32)
+        self._birth_flat = self.birth.reshape(-1)
+        self._base = np.arange(n, dtype=np.int64) * self.cells
+
+        self.head_x = np.empty(n, dtype=np.int32)
+        self.head_y = np.empty(n, dtype=np.int32)
+        self.direction = np.empty(n, dtype=np.int32)
+        self.length = np.empty(n, dtype=np.int32)
+        self.ticks = np.empty(n, dtype=np.int32)
+        self.food = np.empty(n, dtype=np.int64)
+        self.score = np.empty(n, dtype=np.int32)
+        self.alive = np.empty(n, dtype=bool)
+
+        # Score of the most recently finished game on each board
+        self.last_score = np.zeros(n, dtype=np.int32)
+        self.games_finished = 0
+
+        self.reset()
+
+    def reset(self, boards=None):
+        """Reset all boards, or only the given indices / boolean mask."""
+        if boards is None:
+            boards = np.arange(self.n)
+        elif np.asarray(boards).dtype == bool:
+            boards = np.flatnonzero(boards)
+        if len(boards) == 0:
+            return
+
+        self.birth[boards] = _NEVER
+        # Start like SnakeGame: moving right, two segments behind the head
+        for age, (x, y) in enumerate(self.start):
+            self.birth[boards, y * self.cols + x] = -age
+        self.head_x[boards], self.head_y[boards] = self.start[0]
+        self.direction[boards] = ACTIONS.index(RIGHT)
+        self.length[boards] = len(self.start)
+        self.ticks[boards] = 0
+        self.score[boards] = 0
+        self.alive[boards] = True
+        # First food in the middle, unless the snake starts there
+        middle = (self.cols // 2, self.rows // 2)
+        if middle in self.start:
+            self._spawn_food(boards)
+        else:
+            self.food[boards] = middle[1] * self.cols + middle[0]
+
+    def occupancy(self):
+        """Boolean array (n, rows, cols) of cells covered by a snake."""
+        occupied = self.birth > (self.ticks - self.length)[:, None]
+        return occupied.reshape(self.n, self.rows, self.cols)
+
+    def step(self, actions):
+        """Advance every live board by one tick.
+
+        actions is an array of n action codes (NOOP keeps going). Returns
+        (rewards, dones): rewards is 1 where food was eaten, dones marks
+        boards whose game ended this tick. With auto_reset those boards
+        are restarted immediately and their score is kept in last_score.
+        """
+        actions = np.asarray(actions, dtype=np.int32)
+        turn = (actions >= 0) & (actions != (self.direction ^ 1))
+        self.direction = np.where(turn, actions, self.direction)
+
+        nx = self.head_x + _DX[self.direction]
+        ny = self.head_y + _DY[self.direction]
+        outside = (nx < 0) | (nx >= self.cols) | (ny < 0) | (ny >= self.rows)
+        cell = np.clip(ny, 0, self.rows - 1) * self.cols + np.clip(nx, 0, self.cols - 1)
+        flat = self._base + cell
+
+        # Body as it was before this move, tail included
+        hit = outside | (self._birth_flat[flat] > self.ticks - self.length)
+        dones = hit & self.alive
+        moving = self.alive & ~hit
+
+        self.ticks += moving
+        self._birth_flat[flat[moving]] = self.ticks[moving]
+        self.head_x = np.where(moving, nx, self.head_x)
+        self.head_y = np.where(moving, ny, self.head_y)
+
+        eaten = moving & (cell == self.food)
+        self.length += eaten
+        self.score += eaten
+        if eaten.any():
+            dones |= self._spawn_food(np.flatnonzero(eaten))
+
+        self.alive &= ~dones
+        if dones.any():
+            self.last_score[dones] = self.score[dones]
+            self.games_finished += int(dones.sum())
+            if self.auto_reset:
+                self.reset(dones)
+        return eaten.astype(np.int8), dones
+
+    def _spawn_food(self, boards, tries=8):
+        # Rejection sampling is O(1) expected while boards are mostly empty;
+        # boards that stay unlucky fall back to picking from the free list.
+        pending = boards
+        for _ in range(tries):
+            cand = self.rng.integers(self.cells, size=len(pending))
+            free = self.birth[pending, cand] <= self.ticks[pending] - self.length[pending]
+            self.food[pending[free]] = cand[free]
+            pending = pending[~free]
+            if len(pending) == 0:
+                break
+
+        full = np.zeros(self.n, dtype=bool)
+        for b in pending:
+            free_cells = np.flatnonzero(self.birth[b] <= self.ticks[b] - self.length[b])
+            if len(free_cells) == 0:
+                full[b] = True  # board filled, nothing left to eat
+            else:
+                self.food[b] = free_cells[self.rng.integers(len(free_cells))]
+        return full
@@ -0,0 +1,234 @@
+"""Headless tournaments: many seeded games played by bots, in parallel.
+
+Every game is played by a bot from bots.py that can only change its
+input every --reaction milliseconds or so, roughly like a person, so
+the settings being compared matter to it. Each setting plays the same seeds.
+Games are handed to a pool of worker processes in chunks and the
+results are gathered into one report of score distributions, game
+lengths and throughput.
+
+    python3 tournament.py snake -n 2000 --fps 8 10 15
+    python3 tournament.py jumper -n 1000 --thresholds 30/45 20/35
+    python3 tournament.py brickbreaker -n 500 --ball-speed 3 4 5
+    python3 tournament.py all -n 200 -j 8 --json report.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+# Games are played without a window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import bots
+
+# Milliseconds between a bot's decisions
+REACTION_MS = 150
+
+# Games still running after this many ticks are stopped (and counted)
+MAX_TICKS = {"snake": 5000, "jumper": 20000, "brickbreaker": 30000}
+
+
+class Reaction:
+    """When a bot gets to act: every reaction_ms at fps ticks per second,
+    give or take half, drawn from its own seeded rng like the game's."""
+
+    def __init__(self, reaction_ms, fps, seed):
+        self.ticks = reaction_ms * fps / 1000
+        self.rng = random.Random(seed)
+        self.next = 0
+
+    def due(self, tick):
+        """Ticks until the bot acts again if it acts on this tick, else 0."""
+        if tick < self.next:
+            return 0
+        wait = max(1, round(self.ticks * self.rng.uniform(0.5, 1.5)))
+        self.next = tick + wait
+        return wait
+
+
+# ---------------- GAMES ----------------
+# Each play function plays one game and returns (score, ticks)
+def play_snake(seed, fps, reaction_ms, max_ticks):
+    from python_game import SnakeGame
+    game = SnakeGame(seed=seed)
+    reaction = Reaction(reaction_ms, fps, seed)
+    while game.alive and game.ticks < max_ticks:
+        wait = reaction.due(game.ticks)
+        game.step(bots.snake_move(game, wait) if wait else None)
+    return game.score, game.ticks
+
+
+def play_jumper(seed, thresholds, reaction_ms, max_ticks):
+    import jumper
+    moving_from, breakable_from = thresholds
+    curve = f"classic {moving_from}/{breakable_from}"
+    jumper.DIFFICULTY_CURVES.setdefault(
+        curve, lambda n: jumper.classic_curve(n, moving_from, breakable_from))
+    game = jumper.JumperGame(seed, curve=curve)
+    reaction = Reaction(reaction_ms, jumper.FPS, seed)
+    keys = (False, False)
+    while game.alive and game.ticks < max_ticks:
+        if reaction.due(game.ticks):
+            keys = bots.jumper_keys(game)
+        game.step(*keys)
+    return game.score, game.ticks
+
+
+def play_brickbreaker(seed, ball_speed, reaction_ms, max_ticks):
+    import brickbreaker
+    # Each worker is its own process, so this only changes its games
+    brickbreaker.BALL_SPEED = ball_speed
+    game = brickbreaker.BrickBreakerGame(0, seed, batched=False)
+    reaction = Reaction(reaction_ms, brickbreaker.FPS, seed)
+    keys = (False, False, False)
+    while game.alive and game.ticks < max_ticks:
+        if reaction.due(game.ticks):
+            keys = bots.brick_keys(game)
+        game.step(*keys)
+    return game.score, game.ticks
+
+
+# game -> (play function, name of the setting it varies)
+GAMES = {
+    "snake": (play_snake, "fps"),
+    "jumper": (play_jumper, "thresholds"),
+    "brickbreaker": (play_brickbreaker, "ball speed"),
+}
+
+
+def play_chunk(task):
+    """Worker: play one chunk of seeds with one setting."""
+    game, setting, seeds, reaction_ms, max_ticks = task
+    play = GAMES[game][0]
+    start = time.process_time()  # CPU time: workers may share cores
+    results = [play(seed, setting, reaction_ms, max_ticks) for seed in seeds]
+    return game, setting, results, time.process_time() - start
+
+
+# ---------------- REPORT ----------------
+def percentile(sorted_values, p):
+    index = min(len(sorted_values) - 1, round(p / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def summarize(results, seconds, max_ticks):
+    """Score distribution and game lengths; rates are per CPU second."""
+    scores = sorted(score for score, _ in results)
+    ticks = [t for _, t in results]
+    return {
+        "games": len(results),
+        "mean": sum(scores) / len(scores),
+        "p10": percentile(scores, 10),
+        "p50": percentile(scores, 50),
+        "p90": percentile(scores, 90),
+        "max": scores[-1],
+        "mean_ticks": sum(ticks) / len(ticks),
+        "capped": sum(t >= max_ticks for t in ticks),
+        "games_per_sec": len(results) / seconds if seconds else 0.0,
+        "ticks_per_sec": sum(ticks) / seconds if seconds else 0.0,
+        "scores": {str(s): n for s, n in sorted(Counter(scores).items())},
+    }
+
+
+def format_setting(game, setting):
+    return "/".join(map(str, setting)) if game == "jumper" else str(setting)
+
+
+# ---------------- COMMAND LINE ----------------
+def parse_thresholds(text):
+    moving, _, breakable = text.partition("/")
+    try:
+        return int(moving), int(breakable)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected MOVING/BREAKABLE, e.g. 30/45, not {text!r}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless bot tournaments over game settings.")
+    parser.add_argument("game", choices=[*GAMES, "all"])
+    parser.add_argument("-n", "--games", type=int, default=200, help="games per setting")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk", type=int, help="games per work item (default: spread ~8 per job)")
+    parser.add_argument("--seed", type=int, default=1, help="first seed; games use seed, seed+1, ...")
+    parser.add_argument("--reaction", type=int, default=REACTION_MS, metavar="MS")
+    parser.add_argument("--max-ticks", type=int, metavar="TICKS", help="stop games this long")
+    parser.add_argument("--fps", type=int, nargs="+", metavar="FPS",
+                        help="Snake tick rates (default: python_game.FPS)")
+    parser.add_argument("--thresholds", type=parse_thresholds, nargs="+", metavar="M/B",
+                        help="Jumper platform numbers for moving/breakable platforms (default: 30/45)")
+    parser.add_argument("--ball-speed", type=float, nargs="+", metavar="SPEED",
+                        help="Brick Breaker ball speeds (default: brickbreaker.BALL_SPEED)")
+    parser.add_argument("--json", metavar="FILE", help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    settings = {}
+    games = list(GAMES) if args.game == "all" else [args.game]
+    for game in games:
+        if game == "snake":
+            from python_game import FPS
+            settings[game] = args.fps or [FPS]
+        elif game == "jumper":
+            from jumper import BREAKABLE_FROM, MOVING_FROM
+            settings[game] = args.thresholds or [(MOVING_FROM, BREAKABLE_FROM)]
+        else:
+            from brickbreaker import BALL_SPEED
+            settings[game] = args.ball_speed or [BALL_SPEED]
+
+    # Work items: chunks of seeds, small enough to keep every worker busy to the end
+    items = sum(len(values) for values in settings.values())
+    chunk = args.chunk or max(1, min(100, args.games * items // (args.jobs * 8)))
+    seeds = range(args.seed, args.seed + args.games)
+    tasks = []
+    for game, values in settings.items():
+        max_ticks = args.max_ticks or MAX_TICKS[game]
+        for setting in values:
+            for i in range(0, len(seeds), chunk):
+                tasks.append((game, setting, seeds[i:i + chunk], args.reaction, max_ticks))
+
+    print(f"{args.games * items} games in {len(tasks)} chunks "
+          f"of up to {chunk}, {args.jobs} processes")
+    results = {(game, setting): ([], 0.0) for game, values in settings.items() for setting in values}
+    start = time.perf_counter()
+    with multiprocessing.Pool(args.jobs) as pool:
+        for game, setting, chunk_results, seconds in pool.imap_unordered(play_chunk, tasks):
+            played, busy = results[(game, setting)]
+            played.extend(chunk_results)
+            results[(game, setting)] = (played, busy + seconds)
+    wall = time.perf_counter() - start
+
+    report = {}
+    busy_total = ticks_total = 0
+    print(f"{'game':<14}{'setting':>10}{'mean':>9}{'p10':>7}{'p50':>7}{'p90':>7}{'max':>7}"
+          f"{'ticks':>9}{'capped':>8}{'games/cpu-s':>13}")
+    for (game, setting), (played, busy) in results.items():
+        max_ticks = args.max_ticks or MAX_TICKS[game]
+        s = summarize(played, busy, max_ticks)
+        label = format_setting(game, setting)
+        report.setdefault(game, {"setting": GAMES[game][1], "results": {}})["results"][label] = s
+        busy_total += busy
+        ticks_total += sum(t for _, t in played)
+        print(f"{game:<14}{label:>10}{s['mean']:>9.1f}{s['p10']:>7}{s['p50']:>7}{s['p90']:>7}"
+              f"{s['max']:>7}{s['mean_ticks']:>9.0f}{s['capped']:>8}{s['games_per_sec']:>13.1f}")
+
+    games_total = args.games * items
+    # CPU seconds per wall second: how many cores the pool kept busy
+    speedup = busy_total / wall if wall else 0.0
+    print(f"{games_total} games, {ticks_total:,} ticks in {wall:.1f}s: {games_total / wall:.1f} games/s, "
+          f"{ticks_total / wall:,.0f} ticks/s; {speedup:.1f}x CPU time with {args.jobs} processes")
+
+    if args.json:
+        report["throughput"] = {"games": games_total, "ticks": ticks_total, "seconds": wall,
+                                "jobs": args.jobs, "chunk": chunk, "speedup": speedup}
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
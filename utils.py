@@ -0,0 +1,166 @@
+import os
+import pygame
+from collections import OrderedDict
+
+
+# ---------------- FONTS ----------------
+_fonts = {}
+
+
+def get_font(name, size, bold=False):
+    """Return a shared SysFont, creating it the first time it is asked for."""
+    key = (name, size, bold)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.SysFont(name, size, bold)
+    return font
+
+
+def loaded_fonts():
+    return len(_fonts)
+
+
+# ---------------- TEXT CACHE ----------------
+TEXT_CACHE_SIZE = 256
+
+_text_cache = OrderedDict()
+_text_stats = {"hits": 0, "misses": 0}
+
+
+def render_text(font, text, color, antialias=True):
+    """font.render() with a process-wide LRU cache of the result.
+
+    The returned surface is shared between callers, so blit it but do not
+    draw on it.
+    """
+    key = (font, text, tuple(color), antialias)
+    surface = _text_cache.get(key)
+    if surface is not None:
+        _text_cache.move_to_end(key)
+        _text_stats["hits"] += 1
+        return surface
+
+    _text_stats["misses"] += 1
+    surface = _text_cache[key] = font.render(text, antialias, color)
+    if len(_text_cache) > TEXT_CACHE_SIZE:
+        _text_cache.popitem(last=False)  # least recently used
+    return surface
+
+
+def text_cache_stats():
+    """Hit/miss counters, current size and pixel bytes of the text cache."""
+    pixels = sum(s.get_pitch() * s.get_height() for s in _text_cache.values())
+    return dict(_text_stats, size=len(_text_cache), max_size=TEXT_CACHE_SIZE, bytes=pixels)
+
+
+def clear_text_cache():
+    _text_cache.clear()
+    _text_stats["hits"] = _text_stats["misses"] = 0
+
+
+# ---------------- GAME LOOP ----------------
+# Frames drawn per second, independent of each game's simulation rate:
+# ARCADE_RENDER_FPS=144 python3 main.py
+RENDER_FPS = int(os.environ.get("ARCADE_RENDER_FPS", "60"))
+
+# Most simulation ticks run for one frame before the backlog is dropped
+MAX_TICKS_PER_FRAME = 5
+
+
+class FixedStep:
+    """Runs the simulation at a fixed tick rate, whatever the frame rate.
+
+    Each frame, due() says how many ticks of game time have passed since
+    the last frame; the loop runs that many steps and draws once. Time
+    left over that does not make a whole tick is carried to the next frame
+    and exposed as alpha (0..1), so the drawing can be interpolated
+    between the last two states.
+
+    After a long stall (dragging the window, a slow disk) no more than
+    max_ticks are run at once and the rest of the backlog is dropped,
+    so one slow frame cannot snowball into ever longer catch-ups.
+
+        loop = FixedStep(60)
+        while running:
+            for _ in range(loop.due()):
+                game.step()
+            draw(loop.alpha)
+            loop.clock.tick(loop.render_rate)
+    """
+
+    def __init__(self, tick_rate, render_rate=RENDER_FPS, max_ticks=MAX_TICKS_PER_FRAME, clock=None):
+        self.tick_ms = 1000 / tick_rate
+        self.render_rate = render_rate
+        self.max_ticks = max_ticks
+        # Paces frames and measures FPS; a scene passes the SceneManager's
+        self.clock = pygame.time.Clock() if clock is None else clock
+        self.ticks = 0
+        self.dropped = 0
+        self.reset()
+
+    def reset(self):
+        """Start timing afresh, e.g. after another screen was shown."""
+        self._last = None
+        self._accumulator = 0.0
+
+    def due(self):
+        """Number of simulation ticks to run this frame."""
+        now = pygame.time.get_ticks()
+        if self._last is None:
+            self._last = now
+            return 1  # first frame: one tick, like the old loops
+        self._accumulator += now - self._last
+        self._last = now
+
+        count = int(self._accumulator // self.tick_ms)
+        self._accumulator -= count * self.tick_ms
+        if count > self.max_ticks:
+            self.dropped += count - self.max_ticks
+            count = self.max_ticks
+        self.ticks += count
+        return count
+
+    @property
+    def alpha(self):
+        """How far the current frame is between the last tick and the next."""
+        return self._accumulator / self.tick_ms
+
+
+def lerp(a, b, t):
+    return a + (b - a) * t
+
+
+def particle_system(surface):
+    """A particles.ParticleSystem drawing on surface, or None without NumPy."""
+    try:
+        from particles import ParticleSystem
+    except ImportError:
+        return None  # particles are decoration; play on without them
+    return ParticleSystem(surface)
+
+
+# ---------------- SHARED SCREENS ----------------
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+
+
+def draw_leaderboard(screen, title, scores, font, big_font,
+                     hints=("Press Enter to Play Again", "Press Esc to Return to Menu")):
+    """Draw a top-N list of (initials, score) pairs with the key hints below."""
+    width = screen.get_width()
+    screen.fill(BLACK)
+    leader_title = render_text(big_font, title, WHITE)
+    screen.blit(leader_title, (width // 2 - leader_title.get_width() // 2, 40))
+
+    y_offset = 100
+    for i, (init, sc) in enumerate(scores, start=1):
+        hs_text = render_text(font, f"{i}. {init}  {sc}", WHITE)
+        screen.blit(hs_text, (width // 2 - hs_text.get_width() // 2, y_offset))
+        y_offset += 40
+
+    y_offset += 20
+    for hint in hints:
+        hint_text = render_text(font, hint, WHITE)
+        screen.blit(hint_text, (width // 2 - hint_text.get_width() // 2, y_offset))
+        y_offset += 40
+    pygame.display.flip()